@@ -2,7 +2,7 @@
 
 from .cooking_agent import cooking_agent
 from .nutrition_agent import nutrition_agent
-from .planner_agent import MealPlan, planner_agent
+from .planner_agent import DayPlan, MealPlan, day_repair_agent, planner_agent
 from .recipe_agent import RecipeSearchResult, recipe_agent
 from .shopping_agent import ShoppingList, shopping_agent
 
@@ -12,6 +12,8 @@ __all__ = [
     "nutrition_agent",
     "shopping_agent",
     "cooking_agent",
+    "day_repair_agent",
+    "DayPlan",
     "MealPlan",
     "RecipeSearchResult",
     "ShoppingList",
@@ -1,7 +1,7 @@
 """Agent for providing cooking guidance and tips."""
 
 from agents import Agent
-from examples.meal_prep.tools import get_cooking_tips, get_recipe_by_name
+from examples.meal_prep.async_tools import get_cooking_tips_async, get_recipe_by_name_async
 
 PROMPT = (
     "You are a cooking assistant. Help users with:\n"
@@ -17,5 +17,5 @@ PROMPT = (
 cooking_agent = Agent(
     name="CookingAgent",
     instructions=PROMPT,
-    tools=[get_recipe_by_name, get_cooking_tips],
+    tools=[get_recipe_by_name_async, get_cooking_tips_async],
 )
@@ -1,7 +1,7 @@
 """Agent for analyzing nutrition information."""
 
 from agents import Agent
-from examples.meal_prep.tools import calculate_nutrition
+from examples.meal_prep.async_tools import calculate_nutrition_async
 
 PROMPT = (
     "You are a nutrition analysis assistant. Analyze the nutritional content of recipes "
@@ -18,5 +18,5 @@ PROMPT = (
 nutrition_agent = Agent(
     name="NutritionAgent",
     instructions=PROMPT,
-    tools=[calculate_nutrition],
+    tools=[calculate_nutrition_async],
 )
@@ -1,9 +1,8 @@
 """Agent for generating shopping lists."""
 
-from pydantic import BaseModel, Field
-
 from agents import Agent
-from examples.meal_prep.tools import generate_shopping_list
+from examples.meal_prep.async_tools import generate_shopping_list_async
+from examples.meal_prep.models import ShoppingList
 
 PROMPT = (
     "You are a shopping list assistant. Generate organized shopping lists from meal plans. "
@@ -19,20 +18,9 @@ PROMPT = (
 )
 
 
-class ShoppingList(BaseModel):
-    """A shopping list organized by category."""
-
-    produce: list[str] = Field(default_factory=list, description="Fruits and vegetables")
-    protein: list[str] = Field(default_factory=list, description="Meat, fish, eggs, etc.")
-    dairy: list[str] = Field(default_factory=list, description="Dairy products")
-    pantry: list[str] = Field(default_factory=list, description="Grains, spices, canned goods, etc.")
-    other: list[str] = Field(default_factory=list, description="Other items")
-    total_items: int = Field(description="Total number of unique items")
-
-
 shopping_agent = Agent(
     name="ShoppingAgent",
     instructions=PROMPT,
-    tools=[generate_shopping_list],
+    tools=[generate_shopping_list_async],
     output_type=ShoppingList,
 )
@@ -0,0 +1,86 @@
+"""Async function tools for the meal prep system.
+
+These mirror the tools in `tools.py` and keep the same tool names, but read
+recipes through the async store in `store.py` so lookups never block the
+event loop.
+"""
+
+from typing import Annotated
+
+from agents import function_tool
+
+from .store import get_store
+from .tools import NutritionInfo, Recipe, consolidate_ingredients, cooking_tips_for, estimate_nutrition
+
+
+@function_tool(name_override="search_recipes")
+async def search_recipes_async(
+    query: Annotated[str, "Search query (e.g., 'pasta', 'chicken', 'vegetarian')"],
+    max_results: Annotated[int, "Maximum number of recipes to return"] = 5,
+) -> list[Recipe]:
+    """Search for recipes matching the query."""
+    return await get_store().search(query, max_results)
+
+
+@function_tool(name_override="get_recipe_by_name")
+async def get_recipe_by_name_async(
+    name: Annotated[str, "Exact name of the recipe"]
+) -> Recipe | None:
+    """Get a recipe by its exact name."""
+    return await get_store().get_recipe(name)
+
+
+@function_tool(name_override="get_recipes_by_names")
+async def get_recipes_by_names_async(
+    names: Annotated[list[str], "Exact names of the recipes"]
+) -> list[Recipe]:
+    """Get several recipes by their exact names in one lookup."""
+    recipes = await get_store().get_recipes_by_names(names)
+    return [recipes[name] for name in names if name in recipes]
+
+
+@function_tool(name_override="add_recipe")
+async def add_recipe_async(recipe: Annotated[Recipe, "The recipe to add"]) -> str:
+    """Add a new recipe to the database."""
+    await get_store().add_recipe(recipe)
+    return f"Added recipe: {recipe.name}"
+
+
+@function_tool(name_override="calculate_nutrition")
+async def calculate_nutrition_async(
+    ingredients: Annotated[list[str], "List of ingredients with quantities"],
+    servings: Annotated[int, "Number of servings"] = 4,
+) -> NutritionInfo:
+    """
+    Calculate approximate nutritional information for a recipe.
+    This is a simplified calculation - in production, you'd use a real nutrition API.
+    """
+    return estimate_nutrition(ingredients, servings)
+
+
+@function_tool(name_override="generate_shopping_list")
+async def generate_shopping_list_async(
+    recipes: Annotated[list[str], "List of recipe names"],
+    servings_multiplier: Annotated[float, "Multiply servings by this factor"] = 1.0,
+) -> list[str]:
+    """
+    Generate a consolidated shopping list from multiple recipes.
+    Combines ingredients and groups similar items together.
+    """
+    found = await get_store().get_recipes_by_names(recipes)
+    return consolidate_ingredients(
+        [found[name] for name in recipes if name in found], servings_multiplier
+    )
+
+
+@function_tool(name_override="get_cooking_tips")
+async def get_cooking_tips_async(
+    recipe_name: Annotated[str, "Name of the recipe"],
+    step_number: Annotated[int | None, "Specific step number, or None for general tips"] = None,
+) -> str:
+    """Get helpful cooking tips for a recipe or specific step."""
+    recipe = await get_store().get_recipe(recipe_name)
+    if not recipe:
+        return f"Recipe '{recipe_name}' not found."
+
+    return cooking_tips_for(recipe, step_number)
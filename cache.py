@@ -0,0 +1,346 @@
+"""Plan-level result cache keyed on normalized user intent.
+
+Queries are reduced to a `MealIntent` (days, dietary constraints, time limit,
+cuisine, servings) by a cheap local parser, so "3 days vegetarian quick meals"
+and "Quick vegetarian meals for 3 days" share an entry. Queries with words the
+parser doesn't understand (e.g. "no nuts", "salmon") are never cached, since
+their intent would drop those constraints. Keys also include the schema
+version of the cached payload and a version of the catalogue recipes relevant
+to the intent, so adding recipes only invalidates the entries they could
+affect.
+"""
+
+import hashlib
+import json
+import os
+import random
+import re
+import tempfile
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+from .tools import RECIPE_DATABASE, Recipe
+
+DEFAULT_CACHE_DIR = os.getenv("MEAL_PREP_CACHE_DIR") or str(
+    Path.home() / ".cache" / "meal_prep"
+)
+CACHE_ENABLED = os.getenv("MEAL_PREP_CACHE", "on").lower() not in ("off", "0", "false")
+
+NUMBER_WORDS = {
+    "one": 1,
+    "two": 2,
+    "three": 3,
+    "four": 4,
+    "five": 5,
+    "six": 6,
+    "seven": 7,
+    "eight": 8,
+    "nine": 9,
+    "ten": 10,
+    "a": 1,
+    "an": 1,
+}
+
+# Query phrases mapped to the dietary tag they imply
+DIETARY_KEYWORDS = {
+    "vegetarian": "vegetarian",
+    "veggie": "vegetarian",
+    "veg": "vegetarian",
+    "vegan": "vegan",
+    "gluten-free": "gluten-free",
+    "gluten free": "gluten-free",
+    "dairy-free": "dairy-free",
+    "dairy free": "dairy-free",
+    "keto": "keto",
+    "low-carb": "low-carb",
+    "low carb": "low-carb",
+    "high-protein": "high-protein",
+    "high protein": "high-protein",
+    "pescatarian": "pescatarian",
+    "halal": "halal",
+    "calorie deficit": "low-calorie",
+    "low-calorie": "low-calorie",
+    "low calorie": "low-calorie",
+}
+
+CUISINES = (
+    "italian",
+    "mexican",
+    "asian",
+    "chinese",
+    "japanese",
+    "thai",
+    "indian",
+    "pakistani",
+    "mediterranean",
+    "greek",
+    "french",
+    "middle eastern",
+    "american",
+)
+
+# Time limit assumed for "quick" style queries without an explicit number
+QUICK_MINUTES = 30
+
+# Words that carry no meaning for the plan. Any other word the parser doesn't
+# understand makes the query uncacheable.
+FILLER_WORDS = frozenset(
+    """
+    a an and are at be can could create for give help i in is it like make me meal meals
+    menu most my need of on our per plan planning please prep prepare preparing recipe
+    recipes some than that the to under us want with within would you
+    """.split()
+)
+
+# Words that negate the constraint that follows them (e.g. "non-vegetarian")
+_NEGATION_RE = re.compile(r"\b(?:non|not|no|without)[\s-]*$")
+
+_NUMBER = r"\b(\d+|" + "|".join(NUMBER_WORDS) + r")"
+_DAYS_RE = re.compile(_NUMBER + r"[\s-]*days?\b")
+_WEEKS_RE = re.compile(_NUMBER + r"[\s-]*weeks?\b")
+_WEEK_RE = re.compile(r"\b(?:a\s+)?week\b")
+_MINUTES_RE = re.compile(r"\b(\d+)[\s-]*(?:minutes?|mins?)\b")
+_QUICK_RE = re.compile(r"\b(quick|fast|easy|speedy)\b")
+_SERVINGS_RES = (
+    re.compile(r"\b(?:a\s+)?(?:family|household)\s+of\s+" + _NUMBER + r"\b"),
+    re.compile(_NUMBER + r"[\s-]*(?:people|persons|adults|servings|portions)\b"),
+    re.compile(r"\bserv(?:es|ing)\s+" + _NUMBER + r"\b"),
+)
+
+
+class MealIntent(BaseModel):
+    """Normalized intent extracted from a meal prep query."""
+
+    days: int | None = Field(default=None, description="Number of days to plan for")
+    dietary: list[str] = Field(default_factory=list, description="Sorted dietary constraints")
+    max_minutes: int | None = Field(default=None, description="Time limit per recipe")
+    cuisine: str | None = Field(default=None, description="Requested cuisine")
+    servings: int | None = Field(default=None, description="Number of people to cook for")
+    unparsed: list[str] = Field(
+        default_factory=list,
+        exclude=True,
+        description="Words of the query the parser didn't understand",
+    )
+
+    def key(self) -> str:
+        """Return a canonical string for this intent."""
+        return json.dumps(self.model_dump(), sort_keys=True, separators=(",", ":"))
+
+    def cacheable(self) -> bool:
+        """Whether the intent captures the whole query, so it can stand in for it."""
+        parsed = (self.days, self.dietary, self.max_minutes, self.cuisine, self.servings)
+        return not self.unparsed and any(value for value in parsed)
+
+
+def _to_int(value: str) -> int:
+    return int(value) if value.isdigit() else NUMBER_WORDS[value]
+
+
+def _consume(text: str, match: re.Match[str]) -> str:
+    """Blank out a matched span so it isn't parsed again or reported as unparsed."""
+    start, end = match.span()
+    return text[:start] + " " * (end - start) + text[end:]
+
+
+def parse_intent(query: str) -> MealIntent:
+    """Extract a `MealIntent` from a free-form query without calling a model.
+
+    Words that aren't understood are kept in `unparsed`, and negated
+    constraints ("non-vegetarian", "not vegan") are never read as the
+    constraint itself.
+    """
+    text = query.lower()
+
+    days = None
+    if match := _DAYS_RE.search(text):
+        days = _to_int(match.group(1))
+    elif match := _WEEKS_RE.search(text):
+        days = 7 * _to_int(match.group(1))
+    elif match := _WEEK_RE.search(text):
+        days = 7
+    if match:
+        text = _consume(text, match)
+
+    servings = None
+    for pattern in _SERVINGS_RES:
+        if match := pattern.search(text):
+            servings = _to_int(match.group(1))
+            text = _consume(text, match)
+            break
+
+    dietary = set()
+    # Longest phrases first, so "gluten free" isn't left half-parsed
+    for phrase in sorted(DIETARY_KEYWORDS, key=len, reverse=True):
+        for match in re.finditer(r"\b" + re.escape(phrase) + r"\b", text):
+            if _NEGATION_RE.search(text, 0, match.start()):
+                continue  # Left unparsed, so the query isn't cached
+            dietary.add(DIETARY_KEYWORDS[phrase])
+            text = _consume(text, match)
+    if "vegan" in dietary:
+        dietary.discard("vegetarian")
+
+    max_minutes = None
+    if match := _MINUTES_RE.search(text):
+        max_minutes = int(match.group(1))
+        text = _consume(text, match)
+    elif match := _QUICK_RE.search(text):
+        max_minutes = QUICK_MINUTES
+        text = _consume(text, match)
+
+    cuisine = None
+    for name in CUISINES:
+        if match := re.search(r"\b" + name + r"\b", text):
+            if not _NEGATION_RE.search(text, 0, match.start()):
+                cuisine = name
+                text = _consume(text, match)
+            break
+
+    unparsed = [word for word in re.findall(r"[a-z0-9]+", text) if word not in FILLER_WORDS]
+    return MealIntent(
+        days=days,
+        dietary=sorted(dietary),
+        max_minutes=max_minutes,
+        cuisine=cuisine,
+        servings=servings,
+        unparsed=unparsed,
+    )
+
+
+def matches_intent(recipe: Recipe, intent: MealIntent) -> bool:
+    """Check whether a catalogue recipe could be used for an intent."""
+    tags = {tag.lower() for tag in recipe.dietary_tags}
+    if not set(intent.dietary) <= tags:
+        return False
+    if intent.cuisine and (recipe.cuisine_type or "").lower() != intent.cuisine:
+        return False
+    total_minutes = recipe.prep_time_minutes + recipe.cook_time_minutes
+    if intent.max_minutes is not None and total_minutes > intent.max_minutes:
+        return False
+    return True
+
+
+def schema_version(model: type[BaseModel]) -> str:
+    """Hash the JSON schema of a payload model, for use as a cache schema version."""
+    schema = json.dumps(model.model_json_schema(), sort_keys=True)
+    return hashlib.sha256(schema.encode()).hexdigest()[:12]
+
+
+def catalogue_version(intent: MealIntent, catalogue: Mapping[str, Recipe] | None = None) -> str:
+    """Hash the catalogue recipes relevant to an intent.
+
+    Recipes that can't be used for the intent don't affect the version, so
+    adding a Mexican recipe leaves cached Italian plans valid.
+    """
+    catalogue = RECIPE_DATABASE if catalogue is None else catalogue
+    digest = hashlib.sha256()
+    for name in sorted(catalogue):
+        recipe = catalogue[name]
+        if matches_intent(recipe, intent):
+            digest.update(recipe.model_dump_json().encode())
+    return digest.hexdigest()[:16]
+
+
+class PlanCache:
+    """Bounded on-disk cache of whole workflow outputs with LRU eviction.
+
+    `schema_version` identifies the shape of the stored payloads, so entries
+    written by an older version of the workflow are never returned.
+
+    Each key keeps up to `variants` different outputs. Until all slots are
+    filled, lookups miss so new variants get generated; after that a random
+    variant is returned, so users asking the same thing don't all get the
+    same plan.
+    """
+
+    def __init__(
+        self,
+        directory: str = DEFAULT_CACHE_DIR,
+        max_entries: int = 256,
+        variants: int = 3,
+        seed: int | None = None,
+        schema_version: str = "",
+    ) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.variants = variants
+        self.schema_version = schema_version
+        self._random = random.Random(seed)
+
+    def _key(self, intent: MealIntent, catalogue: Mapping[str, Recipe] | None) -> str:
+        version = catalogue_version(intent, catalogue)
+        return f"{self.schema_version}|{intent.key()}|{version}"
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{hashlib.sha256(key.encode()).hexdigest()}.json"
+
+    def _load(self, path: Path) -> list[dict[str, Any]]:
+        try:
+            with path.open(encoding="utf-8") as f:
+                return json.load(f)["variants"]
+        except (OSError, ValueError, KeyError):
+            return []
+
+    def get(
+        self, intent: MealIntent, catalogue: Mapping[str, Recipe] | None = None
+    ) -> dict[str, Any] | None:
+        """Return a cached output for the intent, or None on a miss.
+
+        `catalogue` is the recipe catalogue the output was planned from
+        (`RECIPE_DATABASE` by default).
+        """
+        path = self._path(self._key(intent, catalogue))
+        variants = self._load(path)
+        if not variants or len(variants) < self.variants:
+            return None
+        try:
+            os.utime(path)  # Mark as recently used
+        except OSError:
+            pass
+        return self._random.choice(variants)
+
+    def put(
+        self,
+        intent: MealIntent,
+        payload: dict[str, Any],
+        catalogue: Mapping[str, Recipe] | None = None,
+    ) -> None:
+        """Store an output for the intent and evict least recently used entries."""
+        key = self._key(intent, catalogue)
+        path = self._path(key)
+        variants = self._load(path)
+        variants.append(payload)
+        variants = variants[-self.variants :]
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"key": key, "variants": variants}, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+        self._evict()
+
+    def invalidate(
+        self, intent: MealIntent, catalogue: Mapping[str, Recipe] | None = None
+    ) -> None:
+        """Remove the entry for an intent, e.g. after it failed to load."""
+        self._path(self._key(intent, catalogue)).unlink(missing_ok=True)
+
+    def _evict(self) -> None:
+        entries = []
+        for path in self.directory.glob("*.json"):
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except OSError:
+                continue
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort()
+        for _, path in entries[: len(entries) - self.max_entries]:
+            path.unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        """Remove every cached entry."""
+        for path in self.directory.glob("*.json"):
+            path.unlink(missing_ok=True)
@@ -0,0 +1,65 @@
+"""Thin client for the meal prep service.
+
+Sends a query to a running service (see `service.py`) and prints the
+result, so each request skips the imports, agent setup and catalogue
+loading that a one-shot run pays for. Only the output models and the
+printer are imported here; nothing in this module loads the agents SDK.
+"""
+
+import os
+
+import httpx
+from rich.console import Console
+
+from .models import MealPrepResult
+from .printer import Printer, print_results
+
+# "http://host:port" or "unix:/path/to/socket"
+DEFAULT_SERVICE_URL = os.getenv("MEAL_PREP_SERVICE_URL") or "http://127.0.0.1:8765"
+
+
+def _client(url: str) -> tuple[httpx.AsyncClient, str]:
+    """Create an HTTP client for a service URL and return it with the base URL to use."""
+    timeout = httpx.Timeout(None, connect=2)
+    if url.startswith("unix:"):
+        transport = httpx.AsyncHTTPTransport(uds=url[len("unix:") :])
+        return httpx.AsyncClient(transport=transport, timeout=timeout), "http://meal-prep"
+    return httpx.AsyncClient(timeout=timeout), url.rstrip("/")
+
+
+async def service_available(url: str = DEFAULT_SERVICE_URL) -> bool:
+    """Check whether a service is running and accepting work at `url`."""
+    client, base_url = _client(url)
+    async with client:
+        try:
+            response = await client.get(f"{base_url}/health")
+        except httpx.TransportError:
+            return False
+    return response.status_code == 200
+
+
+async def run_remote(query: str, url: str = DEFAULT_SERVICE_URL) -> MealPrepResult:
+    """Run a query on the service and print the results."""
+    printer = Printer(Console())
+    printer.update_item("start", f"Sending request to meal prep service at {url}...")
+    client, base_url = _client(url)
+    async with client:
+        try:
+            response = await client.post(f"{base_url}/run", json={"query": query})
+            printer.update_item("start", "Meal prep workflow complete!", is_done=True)
+        finally:
+            printer.end()
+    if response.status_code != 200:
+        error = response.json().get("error", response.text)
+        raise RuntimeError(f"Meal prep service returned {response.status_code}: {error}")
+
+    result = MealPrepResult.model_validate(response.json())
+    print_results(
+        result.meal_plan,
+        result.recipes_found,
+        result.nutrition_analysis,
+        result.shopping_list,
+        result.cooking_tips,
+        result.ingredient_reuse,
+    )
+    return result
@@ -1,13 +1,11 @@
 """Main entry point for the meal prep system example."""
 
 import asyncio
+import os
 
 from examples.auto_mode import input_with_fallback
 
-# Import config to set up API key
-from . import config  # noqa: F401
-
-from .manager import MealPrepManager
+from .client import DEFAULT_SERVICE_URL, run_remote, service_available
 
 
 async def main() -> None:
@@ -17,8 +15,26 @@ async def main() -> None:
         "(e.g., 'Plan meals for 3 days, vegetarian, quick recipes'): ",
         "Plan meals for 3 days with a mix of vegetarian and protein options, quick to prepare",
     )
-    manager = MealPrepManager()
-    await manager.run(query)
+    # Use the long-running service when one is up (see service.py)
+    if await service_available(DEFAULT_SERVICE_URL):
+        await run_remote(query, DEFAULT_SERVICE_URL)
+        return
+
+    # Only an in-process run needs the agents, so they are imported after the service
+    # check. Import config to set up API key.
+    from . import config  # noqa: F401
+    from .manager import MealPrepManager
+    from .recording import SessionRecorder
+
+    # Set MEAL_PREP_RECORD to a file path to record the run for offline replay
+    record_path = os.getenv("MEAL_PREP_RECORD")
+    recorder = SessionRecorder(record_path) if record_path else None
+    manager = MealPrepManager(recorder=recorder)
+    try:
+        await manager.run(query)
+    finally:
+        if recorder:
+            recorder.close()
 
 
 if __name__ == "__main__":
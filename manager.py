@@ -2,34 +2,179 @@
 
 from __future__ import annotations
 
+import asyncio
+import contextvars
+from collections.abc import Awaitable, Iterable
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Any, TypeVar
+
+from openai import APIConnectionError, InternalServerError, RateLimitError
+from pydantic import ValidationError
 from rich.console import Console
 
-from agents import Runner, custom_span, gen_trace_id, trace
+from agents import (
+    Agent,
+    AgentsException,
+    ModelBehaviorError,
+    Runner,
+    RunConfig,
+    RunHooks,
+    RunResult,
+    custom_span,
+    gen_trace_id,
+    trace,
+)
 
 from .agents import (
+    DayPlan,
     MealPlan,
     RecipeSearchResult,
     ShoppingList,
     cooking_agent,
+    day_repair_agent,
     nutrition_agent,
     planner_agent,
     recipe_agent,
     shopping_agent,
 )
-from .printer import Printer
-from .tools import RECIPE_DATABASE, Recipe
+from .cache import (
+    CACHE_ENABLED,
+    MealIntent,
+    PlanCache,
+    matches_intent,
+    parse_intent,
+    schema_version,
+)
+from .planning import (
+    CHUNK_DAYS,
+    MAX_PLAN_DAYS,
+    chunk_prompt,
+    merge_chunks,
+    repeated_recipes,
+    replace_repeats,
+    reserve_recipes,
+    split_horizon,
+    used_elsewhere,
+)
+from .models import MealPrepResult, PlanOptimization
+from .overlap import IngredientIndex, optimize_plan
+from .printer import Printer, print_results
+from .repair import repair_meal_plan, repair_shopping_list, snap_recipe_name
+from .router import ModelRouter
+from .store import RecipeStore, get_store
+from .tools import Recipe
+
+if TYPE_CHECKING:
+    from .recording import SessionRecorder
+
+# Number of attempts for a single chunk of a long meal plan
+CHUNK_ATTEMPTS = 3
+
+# Delay before retrying a chunk after a transient provider error, doubled on each attempt
+CHUNK_BACKOFF_SECONDS = 1.0
+
+# Provider errors worth retrying: timeouts, dropped connections, rate limits and 5xx
+TRANSIENT_ERRORS = (APIConnectionError, InternalServerError, RateLimitError, asyncio.TimeoutError)
+
+# Planner calls for chunks of long plans that may run at once, across all runs
+CHUNK_CONCURRENCY = 4
+
+# Rounds of re-planning chunks that repeat dishes from other chunks
+REPLAN_ROUNDS = 2
+
+# Progress printer of the run the current task belongs to, so concurrent runs on
+# one manager (e.g. in the service) don't share a live display
+_current_printer: contextvars.ContextVar[Printer | None] = contextvars.ContextVar(
+    "meal_prep_printer", default=None
+)
+
+# Printer item used to report progress for each routed stage
+STAGE_ITEMS = {
+    "planner": "planning",
+    "repair": "planning",
+    "recipe": "searching",
+    "nutrition": "nutrition",
+    "shopping": "shopping",
+    "cooking": "tips",
+}
+
+
+T = TypeVar("T")
+
+
+async def _gather_or_cancel(aws: Iterable[Awaitable[T]]) -> list[T]:
+    """Like asyncio.gather, but cancel the other tasks as soon as one fails."""
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        return list(await asyncio.gather(*tasks))
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
 
 
 class MealPrepManager:
     """Orchestrates the meal prep workflow with multiple agents."""
 
-    def __init__(self) -> None:
-        self.console = Console()
-        self.printer = Printer(self.console)
-        self._initialize_sample_recipes()
+    def __init__(
+        self,
+        router: ModelRouter | None = None,
+        cache: PlanCache | None = None,
+        use_cache: bool = CACHE_ENABLED,
+        run_config: RunConfig | None = None,
+        hooks: RunHooks[Any] | None = None,
+        recorder: SessionRecorder | None = None,
+        quiet: bool = False,
+        chunk_concurrency: int = CHUNK_CONCURRENCY,
+    ) -> None:
+        self.console = Console(quiet=quiet)
+        self.quiet = quiet
+        self._idle_printer = Printer(Console(quiet=True))
+        self.router = router or ModelRouter()
+
+        # Snapshot of the recipe store, reloaded by load_catalogue() when it changes
+        self.catalogue: dict[str, Recipe] = {}
+        self.ingredient_index = IngredientIndex([])
+        self._catalogue_lock = asyncio.Lock()
+        self._catalogue_source: tuple[RecipeStore, int] | None = None
+        self._seeded_store: RecipeStore | None = None
+        self._chunk_slots = asyncio.Semaphore(chunk_concurrency)
+        self.cache = cache or (
+            PlanCache(schema_version=schema_version(MealPrepResult)) if use_cache else None
+        )
 
-    def _initialize_sample_recipes(self) -> None:
-        """Initialize the recipe database with some sample recipes."""
+        # A recorder captures every model call and tool call made by the agents,
+        # wrapping the model provider of the caller's run config if there is one
+        self.recorder = recorder
+        if recorder is not None:
+            run_config = recorder.run_config(run_config)
+            hooks = hooks or recorder.hooks
+        self.run_config = run_config
+        self.hooks = hooks
+
+    @property
+    def printer(self) -> Printer:
+        """Progress printer of the current run."""
+        return _current_printer.get() or self._idle_printer
+
+    async def load_catalogue(self) -> None:
+        """Seed an empty recipe store and reload the catalogue if the store has changed."""
+        async with self._catalogue_lock:
+            store = get_store()
+            if store is not self._seeded_store:
+                # Never overwrite recipes that are already there
+                if not await store.count():
+                    await self._initialize_sample_recipes(store)
+                self._seeded_store = store
+            if self._catalogue_source != (store, store.revision):
+                recipes = await store.all_recipes()
+                self.catalogue = {recipe.name: recipe for recipe in recipes}
+                self.ingredient_index = await asyncio.to_thread(IngredientIndex, recipes)
+                self._catalogue_source = (store, store.revision)
+
+    async def _initialize_sample_recipes(self, store: RecipeStore) -> None:
+        """Initialize the recipe store with some sample recipes."""
         sample_recipes = [
             Recipe(
                 name="Chicken Stir Fry",
@@ -154,13 +299,35 @@ class MealPrepManager:
             ),
         ]
 
-        for recipe in sample_recipes:
-            RECIPE_DATABASE[recipe.name] = recipe
+        await store.add_recipes(sample_recipes)
 
-    async def run(self, query: str) -> None:
+    async def run(self, query: str) -> MealPrepResult:
         """Run the complete meal prep workflow."""
+        printer = Printer(self.console)
+        token = _current_printer.set(printer)
+        try:
+            result = await self._run(query)
+        finally:
+            printer.end()
+            _current_printer.reset(token)
+
+        # Print results
+        if not self.quiet:
+            print_results(
+                result.meal_plan,
+                result.recipes_found,
+                result.nutrition_analysis,
+                result.shopping_list,
+                result.cooking_tips,
+                result.ingredient_reuse,
+            )
+        return result
+
+    async def _run(self, query: str) -> MealPrepResult:
+        """Run the workflow, or serve it from the plan cache, inside a trace."""
+        session = self.recorder.session(query) if self.recorder else nullcontext()
         trace_id = gen_trace_id()
-        with trace("Meal prep trace", trace_id=trace_id):
+        with session, trace("Meal prep trace", trace_id=trace_id):
             self.printer.update_item(
                 "trace_id",
                 f"View trace: https://platform.openai.com/traces/trace?trace_id={trace_id}",
@@ -170,33 +337,112 @@ class MealPrepManager:
 
             self.printer.update_item("start", "Starting meal prep workflow...", is_done=True)
 
-            # Step 1: Create meal plan
-            meal_plan = await self._create_meal_plan(query)
-
-            # Step 2: Search for recipes if needed
-            recipes_found = await self._search_recipes(meal_plan)
+            await self.load_catalogue()
+
+            # Common queries are served from the plan cache without calling any agent.
+            # Queries the intent parser doesn't fully understand always run the workflow.
+            intent = parse_intent(query)
+            use_cache = self.cache is not None and intent.cacheable()
+            result = await asyncio.to_thread(self._load_cached, intent) if use_cache else None
+            if result is not None:
+                self.printer.update_item("cache", "Loaded meal plan from cache", is_done=True)
+                if self.recorder:
+                    self.recorder.record("cache_hit")
+            else:
+                result = await self._run_workflow(query, intent)
+                if use_cache:
+                    payload = result.model_dump(mode="json")
+                    await asyncio.to_thread(self.cache.put, intent, payload, self.catalogue)
 
-            # Step 3: Analyze nutrition
-            nutrition_analysis = await self._analyze_nutrition(meal_plan)
-
-            # Step 4: Generate shopping list
-            shopping_list = await self._generate_shopping_list(meal_plan)
+            self.printer.update_item("complete", "Meal prep workflow complete!", is_done=True)
+            return result
 
-            # Step 5: Provide cooking tips
-            cooking_tips = await self._get_cooking_tips(meal_plan)
+    def _load_cached(self, intent: MealIntent) -> MealPrepResult | None:
+        """Load a cached result, treating entries that no longer validate as a miss."""
+        cached = self.cache.get(intent, self.catalogue)
+        if cached is None:
+            return None
+        try:
+            return MealPrepResult.model_validate(cached)
+        except ValidationError:
+            self.cache.invalidate(intent, self.catalogue)
+            return None
+
+    async def _run_workflow(self, query: str, intent: MealIntent) -> MealPrepResult:
+        """Run every agent stage for a query."""
+        # Step 1: Create meal plan
+        meal_plan = await self._create_meal_plan(query, intent)
+
+        # Swap catalogue meals to reuse ingredients and plan batch prep
+        ingredient_reuse = await self._optimize_ingredients(meal_plan, intent)
+        if ingredient_reuse is not None:
+            meal_plan = ingredient_reuse.meal_plan
+
+        # Step 2: Search for recipes if needed
+        recipes_found = await self._search_recipes(meal_plan, intent.dietary)
+
+        # Step 3: Analyze nutrition
+        nutrition_analysis = await self._analyze_nutrition(meal_plan)
+
+        # Step 4: Generate shopping list
+        shopping_list = await self._generate_shopping_list(meal_plan)
+
+        # Step 5: Provide cooking tips
+        cooking_tips = await self._get_cooking_tips(meal_plan)
+
+        return MealPrepResult(
+            meal_plan=meal_plan,
+            recipes_found=recipes_found,
+            nutrition_analysis=nutrition_analysis,
+            shopping_list=shopping_list,
+            cooking_tips=cooking_tips,
+            ingredient_reuse=ingredient_reuse,
+        )
 
-            self.printer.update_item("complete", "Meal prep workflow complete!", is_done=True)
-            self.printer.end()
+    async def _run_stage(
+        self,
+        stage: str,
+        agent: Agent[Any],
+        input: str,
+        output_type: type | None = None,
+        plan_size: int = 0,
+    ) -> RunResult:
+        """Run an agent on the model routed for its stage.
+
+        If the structured output fails validation, the stage is retried once on
+        a stronger model instead of failing the whole workflow.
+        """
+        model = self.router.select(stage, plan_size)
+        while True:
+            try:
+                result = await Runner.run(
+                    agent.clone(model=model), input, hooks=self.hooks, run_config=self.run_config
+                )
+                if output_type is not None and not isinstance(result.final_output, output_type):
+                    raise ModelBehaviorError(
+                        f"{agent.name} did not return a valid {output_type.__name__}"
+                    )
+                return result
+            except ModelBehaviorError:
+                stronger = self.router.escalate(model)
+                if stronger is None:
+                    raise
 
-            # Print results
-            self._print_results(meal_plan, recipes_found, nutrition_analysis, shopping_list, cooking_tips)
+            self.printer.update_item(
+                STAGE_ITEMS.get(stage, stage), f"Retrying {stage} with {stronger}..."
+            )
+            model = stronger
 
-    async def _create_meal_plan(self, query: str) -> MealPlan:
+    async def _create_meal_plan(self, query: str, intent: MealIntent) -> MealPlan:
         """Create a meal plan based on user query."""
         self.printer.update_item("planning", "Creating meal plan...")
         try:
-            result = await Runner.run(planner_agent, query)
-            meal_plan = result.final_output_as(MealPlan)
+            if intent.days is not None and intent.days > CHUNK_DAYS:
+                meal_plan = await self._create_chunked_meal_plan(query, intent)
+            else:
+                result = await self._run_stage("planner", planner_agent, query, MealPlan)
+                meal_plan = result.final_output_as(MealPlan)
+            meal_plan = await self._repair_meal_plan(query, meal_plan, intent.dietary)
             self.printer.update_item(
                 "planning",
                 f"Created meal plan for {meal_plan.total_days} days",
@@ -219,7 +465,151 @@ class MealPrepManager:
                 ) from e
             raise
 
-    async def _search_recipes(self, meal_plan: MealPlan) -> RecipeSearchResult | None:
+    async def _repair_meal_plan(
+        self, query: str, meal_plan: MealPlan, dietary: list[str]
+    ) -> MealPlan:
+        """Repair a generated plan, sending only the broken days back to the model."""
+        meal_plan, broken = await asyncio.to_thread(
+            repair_meal_plan, meal_plan, self.catalogue, dietary, query
+        )
+        if not broken:
+            return meal_plan
+
+        self.printer.update_item("planning", f"Repairing {len(broken)} day(s) of the meal plan...")
+        fixed_days = await asyncio.gather(
+            *(
+                self._repair_day(query, meal_plan.days[index], problems)
+                for index, problems in broken.items()
+            )
+        )
+        days = list(meal_plan.days)
+        for index, day in zip(broken, fixed_days):
+            if day is not None:
+                days[index] = day
+        meal_plan = meal_plan.model_copy(update={"days": days})
+        meal_plan, _ = await asyncio.to_thread(
+            repair_meal_plan, meal_plan, self.catalogue, dietary, query
+        )
+        return meal_plan
+
+    async def _repair_day(self, query: str, day: DayPlan, problems: list[str]) -> DayPlan | None:
+        """Ask the model to fix a single day. Returns None if the fix fails."""
+        repair_input = (
+            f"Original request: {query}\n"
+            f"Problems: {'; '.join(problems)}\n"
+            f"Day to fix: {day.model_dump_json()}"
+        )
+        try:
+            result = await self._run_stage("repair", day_repair_agent, repair_input, DayPlan)
+        except AgentsException:
+            return None
+        return result.final_output_as(DayPlan)
+
+    async def _create_chunked_meal_plan(self, query: str, intent: MealIntent) -> MealPlan:
+        """Plan a long horizon as week-sized chunks generated in parallel."""
+        days = intent.days or CHUNK_DAYS
+        if days > MAX_PLAN_DAYS:
+            raise ValueError(f"Meal plans are limited to {MAX_PLAN_DAYS} days, got {days}")
+        spans = split_horizon(days)
+        with custom_span("Chunked meal plan"):
+            # Each chunk gets its own share of the catalogue dishes up front
+            suitable = [
+                recipe.name
+                for recipe in self.catalogue.values()
+                if matches_intent(recipe, intent)
+            ]
+            reserved_elsewhere = reserve_recipes(suitable, len(spans))
+            chunks = await _gather_or_cancel(
+                self._plan_chunk(query, first, count, days, excluded)
+                for (first, count), excluded in zip(spans, reserved_elsewhere)
+            )
+
+            # Re-plan chunks that still repeat dishes, excluding every dish used by the
+            # other chunks, and check again. Each round fixes at least the earliest
+            # repeating chunk, since the chunks before it are left unchanged.
+            for _ in range(REPLAN_ROUNDS):
+                repeats = repeated_recipes(chunks)
+                if not repeats:
+                    break
+                self.printer.update_item(
+                    "planning", f"Re-planning {len(repeats)} chunk(s) with repeated dishes..."
+                )
+                replanned = await _gather_or_cancel(
+                    self._plan_chunk(query, *spans[index], days, used_elsewhere(chunks, index))
+                    for index in repeats
+                )
+                for index, chunk in zip(repeats, replanned):
+                    chunks[index] = chunk
+
+            # Swap any repeats that are left for unused catalogue dishes
+            unresolved = replace_repeats(chunks, suitable)
+
+        meal_plan = merge_chunks(chunks)
+        if unresolved:
+            warning = f"Warning: these dishes are repeated across the plan: {', '.join(unresolved)}."
+            meal_plan.dietary_notes = " ".join(filter(None, [meal_plan.dietary_notes, warning]))
+        return meal_plan
+
+    async def _plan_chunk(
+        self,
+        query: str,
+        first_day: int,
+        num_days: int,
+        total_days: int,
+        excluded: list[str] | None = None,
+    ) -> MealPlan:
+        """Plan one chunk of a long meal plan, retrying only this chunk on failure."""
+        prompt = chunk_prompt(query, first_day, num_days, total_days, excluded)
+        attempt = 1
+        while True:
+            try:
+                async with self._chunk_slots:
+                    result = await self._run_stage("planner", planner_agent, prompt, MealPlan)
+                chunk = result.final_output_as(MealPlan)
+                if len(chunk.days) < num_days:
+                    raise ModelBehaviorError(
+                        f"Expected {num_days} days for days {first_day}+, got {len(chunk.days)}"
+                    )
+                chunk.days = chunk.days[:num_days]
+                chunk.total_days = num_days
+                return chunk
+            except (AgentsException, *TRANSIENT_ERRORS) as e:
+                if attempt >= CHUNK_ATTEMPTS:
+                    raise
+                if isinstance(e, TRANSIENT_ERRORS):
+                    await asyncio.sleep(CHUNK_BACKOFF_SECONDS * 2 ** (attempt - 1))
+                attempt += 1
+                self.printer.update_item(
+                    "planning", f"Retrying days {first_day}-{first_day + num_days - 1}..."
+                )
+
+    async def _optimize_ingredients(
+        self, meal_plan: MealPlan, intent: MealIntent
+    ) -> PlanOptimization | None:
+        """Optimise the catalogue meals in a plan for ingredient reuse."""
+        chunked = intent.days is not None and intent.days > CHUNK_DAYS
+        # CPU-bound on large catalogues, so keep it off the event loop
+        optimization = await asyncio.to_thread(
+            optimize_plan,
+            meal_plan,
+            self.ingredient_index,
+            intent=intent,
+            chunk_days=CHUNK_DAYS if chunked else None,
+        )
+        if not optimization.unique_items_before:
+            return None
+        self.printer.update_item(
+            "overlap",
+            f"Ingredient reuse: {optimization.unique_items_before} -> "
+            f"{optimization.unique_items_after} unique items, "
+            f"{optimization.prep_minutes_before} -> {optimization.prep_minutes_after} min prep",
+            is_done=True,
+        )
+        return optimization
+
+    async def _search_recipes(
+        self, meal_plan: MealPlan, dietary: list[str]
+    ) -> RecipeSearchResult | None:
         """Search for recipes needed in the meal plan."""
         with custom_span("Search recipes"):
             self.printer.update_item("searching", "Searching for recipes...")
@@ -232,8 +622,18 @@ class MealPrepManager:
 
             # Search for each recipe
             search_query = ", ".join(recipe_names)
-            result = await Runner.run(recipe_agent, f"Find recipes: {search_query}")
+            result = await self._run_stage(
+                "recipe",
+                recipe_agent,
+                f"Find recipes: {search_query}",
+                RecipeSearchResult,
+                plan_size=len(recipe_names),
+            )
             recipe_result = result.final_output_as(RecipeSearchResult)
+            snapped = (
+                snap_recipe_name(name, self.catalogue, dietary) for name in recipe_result.recipes
+            )
+            recipe_result.recipes = list(dict.fromkeys(snapped))
 
             found_count = len(recipe_result.recipes)
             self.printer.update_item(
@@ -255,7 +655,9 @@ class MealPrepManager:
 
         # Get nutrition info for each recipe
         nutrition_input = f"Analyze nutrition for these recipes: {', '.join(set(recipe_names))}"
-        result = await Runner.run(nutrition_agent, nutrition_input)
+        result = await self._run_stage(
+            "nutrition", nutrition_agent, nutrition_input, plan_size=len(set(recipe_names))
+        )
 
         self.printer.mark_item_done("nutrition")
         return result.final_output
@@ -271,8 +673,14 @@ class MealPrepManager:
                 recipe_names.append(meal.recipe_name)
 
         shopping_input = f"Create shopping list for these recipes: {', '.join(set(recipe_names))}"
-        result = await Runner.run(shopping_agent, shopping_input)
-        shopping_list = result.final_output_as(ShoppingList)
+        result = await self._run_stage(
+            "shopping",
+            shopping_agent,
+            shopping_input,
+            ShoppingList,
+            plan_size=len(set(recipe_names)),
+        )
+        shopping_list = repair_shopping_list(result.final_output_as(ShoppingList))
 
         self.printer.update_item(
             "shopping",
@@ -293,68 +701,9 @@ class MealPrepManager:
                     recipe_names.append(meal.recipe_name)
 
         tips_input = f"Provide cooking tips for: {', '.join(recipe_names)}"
-        result = await Runner.run(cooking_agent, tips_input)
+        result = await self._run_stage(
+            "cooking", cooking_agent, tips_input, plan_size=len(recipe_names)
+        )
 
         self.printer.mark_item_done("tips")
         return result.final_output
-
-    def _print_results(
-        self,
-        meal_plan: MealPlan,
-        recipes_found: RecipeSearchResult | None,
-        nutrition_analysis: str,
-        shopping_list: ShoppingList,
-        cooking_tips: str,
-    ) -> None:
-        """Print formatted results."""
-        print("\n" + "=" * 80)
-        print("MEAL PLAN")
-        print("=" * 80 + "\n")
-
-        for day in meal_plan.days:
-            print(f"\n{day.day}:")
-            for meal in day.meals:
-                print(f"  {meal.meal_type.capitalize()}: {meal.recipe_name} ({meal.servings} servings)")
-
-        if meal_plan.dietary_notes:
-            print(f"\nDietary Notes: {meal_plan.dietary_notes}")
-
-        print("\n" + "=" * 80)
-        print("NUTRITION ANALYSIS")
-        print("=" * 80 + "\n")
-        print(nutrition_analysis)
-
-        print("\n" + "=" * 80)
-        print("SHOPPING LIST")
-        print("=" * 80 + "\n")
-
-        if shopping_list.produce:
-            print("PRODUCE:")
-            for item in shopping_list.produce:
-                print(f"  • {item}")
-
-        if shopping_list.protein:
-            print("\nPROTEIN:")
-            for item in shopping_list.protein:
-                print(f"  • {item}")
-
-        if shopping_list.dairy:
-            print("\nDAIRY:")
-            for item in shopping_list.dairy:
-                print(f"  • {item}")
-
-        if shopping_list.pantry:
-            print("\nPANTRY:")
-            for item in shopping_list.pantry:
-                print(f"  • {item}")
-
-        if shopping_list.other:
-            print("\nOTHER:")
-            for item in shopping_list.other:
-                print(f"  • {item}")
-
-        print("\n" + "=" * 80)
-        print("COOKING TIPS")
-        print("=" * 80 + "\n")
-        print(cooking_tips)
-        print()
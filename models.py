@@ -0,0 +1,73 @@
+"""Structured outputs of the meal prep workflow.
+
+These models are kept free of SDK imports so the service client can parse
+and print results without loading the agents.
+"""
+
+from pydantic import BaseModel, Field
+
+
+class MealItem(BaseModel):
+    """A single meal item in the plan."""
+
+    meal_type: str = Field(description="Type of meal: breakfast, lunch, dinner, or snack")
+    recipe_name: str = Field(description="Name of the recipe for this meal")
+    servings: int = Field(description="Number of servings", default=2)
+
+
+class DayPlan(BaseModel):
+    """Meal plan for a single day."""
+
+    day: str = Field(description="Day name (e.g., Monday, Day 1)")
+    meals: list[MealItem] = Field(description="List of meals for this day")
+
+
+class MealPlan(BaseModel):
+    """Complete meal plan."""
+
+    days: list[DayPlan] = Field(description="Meal plan for each day")
+    total_days: int = Field(description="Total number of days planned")
+    dietary_notes: str = Field(
+        default="", description="Notes about dietary considerations in this plan"
+    )
+
+
+class RecipeSearchResult(BaseModel):
+    """Result of a recipe search."""
+
+    recipes: list[str] = Field(description="List of recipe names that match the search criteria")
+    reasoning: str = Field(description="Explanation of why these recipes were selected")
+
+
+class ShoppingList(BaseModel):
+    """A shopping list organized by category."""
+
+    produce: list[str] = Field(default_factory=list, description="Fruits and vegetables")
+    protein: list[str] = Field(default_factory=list, description="Meat, fish, eggs, etc.")
+    dairy: list[str] = Field(default_factory=list, description="Dairy products")
+    pantry: list[str] = Field(default_factory=list, description="Grains, spices, canned goods, etc.")
+    other: list[str] = Field(default_factory=list, description="Other items")
+    total_items: int = Field(description="Total number of unique items")
+
+
+class PlanOptimization(BaseModel):
+    """Result of optimising a meal plan for ingredient reuse."""
+
+    meal_plan: MealPlan
+    unique_items_before: int = Field(description="Unique catalogue ingredients before")
+    unique_items_after: int = Field(description="Unique catalogue ingredients after")
+    prep_minutes_before: int = Field(description="Prep time of the plan as generated")
+    prep_minutes_after: int = Field(description="Prep time after substitutions and batch prep")
+    swaps: list[str] = Field(default_factory=list, description="Substitutions that were made")
+    batch_prep: list[str] = Field(default_factory=list, description="Batch-prep steps")
+
+
+class MealPrepResult(BaseModel):
+    """Outputs of a complete meal prep workflow run."""
+
+    meal_plan: MealPlan
+    recipes_found: RecipeSearchResult | None = None
+    nutrition_analysis: str
+    shopping_list: ShoppingList
+    cooking_tips: str
+    ingredient_reuse: PlanOptimization | None = None
@@ -0,0 +1,396 @@
+"""Ingredient-overlap optimiser for meal plans.
+
+`IngredientIndex` is a sparse recipe x ingredient matrix over the catalogue.
+Each recipe row (and each ingredient column) is stored as a bitset in a
+Python int. Candidate swaps are scored for the whole catalogue at once with
+bit-sliced counters: a count per recipe is stored as a few bitsets, one per
+binary digit, so adding a column or picking the best recipe takes a handful
+of big-int operations instead of a loop over recipes. Pantry staples such
+as salt and olive oil are left out of the index.
+
+`optimize_plan` substitutes catalogue meals to maximise ingredient reuse,
+groups shared ingredients into batch-prep steps and reports how much that
+reduces the shopping list and the prep time. Substitutes must fit the parsed
+query intent, leftover pairs are never split, and dishes aren't repeated
+across the chunks of a long plan.
+"""
+
+import re
+from collections import Counter
+from collections.abc import Iterable
+
+from .cache import MealIntent, matches_intent
+from .models import MealPlan, PlanOptimization
+from .tools import RECIPE_DATABASE, Recipe
+
+# Meals within this many consecutive days can share batch-prepped ingredients
+BATCH_WINDOW_DAYS = 3
+
+# How often a recipe may appear in a plan after substitutions, so by default a
+# substitute is always a dish the plan doesn't have yet
+MAX_REPEATS = 1
+
+# Ingredients every kitchen has; sharing them isn't worth a swap or a batch-prep step
+PANTRY_STAPLES = frozenset(
+    {
+        "black pepper",
+        "cooking spray",
+        "oil",
+        "olive oil",
+        "pepper",
+        "salt",
+        "salt and pepper",
+        "vegetable oil",
+        "water",
+    }
+)
+
+_QUANTITY_RE = re.compile(r"^[\d/.\s-]+")
+_UNIT_RE = re.compile(
+    r"^(cups?|tbsps?|tsps?|tablespoons?|teaspoons?|lbs?|pounds?|oz|ounces?|g|grams?|kg|ml|l|"
+    r"cloves?|packets?|cans?|pinch(es)?|bunch(es)?|slices?|fillets?)\b\s*(of\s+)?"
+)
+
+
+def normalize_ingredient(ingredient: str) -> str:
+    """Reduce an ingredient line to its base name (e.g. "2 cloves garlic, minced" -> "garlic")."""
+    name = re.sub(r"\(.*?\)", "", ingredient.lower()).split(",")[0]
+    name = _QUANTITY_RE.sub("", name.strip())
+    name = _UNIT_RE.sub("", name)
+    name = re.sub(r"\s+to taste$", "", name)
+    return " ".join(name.split())
+
+
+def _bits(mask: int) -> Iterable[int]:
+    """Yield the positions of the set bits in a mask."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+# Bit-sliced counters: a list of bitsets over recipes, where bit i of a recipe's
+# count is set in planes[i]. They are updated for every recipe at once.
+
+
+def _increment(planes: list[int], mask: int) -> None:
+    """Add 1 to the count of every recipe in `mask`."""
+    carry, digit = mask, 0
+    while carry:
+        if digit == len(planes):
+            planes.append(0)
+        planes[digit], carry = planes[digit] ^ carry, planes[digit] & carry
+        digit += 1
+
+
+def _decrement(planes: list[int], mask: int) -> None:
+    """Subtract 1 from the count of every recipe in `mask` (all of them non-zero)."""
+    borrow, digit = mask, 0
+    while borrow:
+        planes[digit], borrow = planes[digit] ^ borrow, ~planes[digit] & borrow
+        digit += 1
+
+
+def _difference(first: list[int], second: list[int]) -> list[int]:
+    """Subtract counts per recipe, where no count in `second` exceeds `first`."""
+    planes, borrow = [], 0
+    for digit in range(max(len(first), len(second))):
+        x = first[digit] if digit < len(first) else 0
+        y = second[digit] if digit < len(second) else 0
+        planes.append(x ^ y ^ borrow)
+        borrow = (~x & (y | borrow)) | (y & borrow)
+    return planes
+
+
+def _lowest(planes: list[int], candidates: int) -> int:
+    """Narrow `candidates` down to the recipes with the lowest count."""
+    for plane in reversed(planes):
+        if candidates & ~plane:
+            candidates &= ~plane
+    return candidates
+
+
+def _highest(planes: list[int], candidates: int) -> int:
+    """Narrow `candidates` down to the recipes with the highest count."""
+    for plane in reversed(planes):
+        if candidates & plane:
+            candidates &= plane
+    return candidates
+
+
+def _count(planes: list[int], position: int) -> int:
+    """Read the count of one recipe."""
+    return sum(((plane >> position) & 1) << digit for digit, plane in enumerate(planes))
+
+
+class IngredientIndex:
+    """Sparse recipe x ingredient matrix with bitset rows and columns."""
+
+    def __init__(self, recipes: Iterable[Recipe] | None = None) -> None:
+        recipes = list(RECIPE_DATABASE.values() if recipes is None else recipes)
+        self.catalogue = recipes
+        self.recipes = [recipe.name for recipe in recipes]
+        self.positions = {name: row for row, name in enumerate(self.recipes)}
+        self.ingredients: list[str] = []
+        self.ingredient_ids: dict[str, int] = {}
+
+        # Rows: ingredients of each recipe. Columns: recipes using each ingredient.
+        self.rows: list[int] = []
+        self.columns: list[int] = []
+        self.sizes: list[int] = []
+        self.tags: list[frozenset[str]] = []
+        self.prep_minutes: list[int] = []
+        # Recipe bitsets by dietary tag, and the ingredient count of each recipe
+        self.tag_masks: dict[str, int] = {}
+        self.size_planes: list[int] = []
+        for row, recipe in enumerate(recipes):
+            mask = 0
+            for ingredient in recipe.ingredients:
+                name = normalize_ingredient(ingredient)
+                if name in PANTRY_STAPLES:
+                    continue
+                if name not in self.ingredient_ids:
+                    self.ingredient_ids[name] = len(self.ingredients)
+                    self.ingredients.append(name)
+                    self.columns.append(0)
+                column = self.ingredient_ids[name]
+                mask |= 1 << column
+                self.columns[column] |= 1 << row
+            self.rows.append(mask)
+            self.sizes.append(mask.bit_count())
+            for digit in _bits(self.sizes[row]):
+                self.size_planes.extend([0] * (digit + 1 - len(self.size_planes)))
+                self.size_planes[digit] |= 1 << row
+            self.tags.append(frozenset(tag.lower() for tag in recipe.dietary_tags))
+            for tag in self.tags[row]:
+                self.tag_masks[tag] = self.tag_masks.get(tag, 0) | 1 << row
+            self.prep_minutes.append(recipe.prep_time_minutes)
+        self.everything = (1 << len(recipes)) - 1
+
+    def __contains__(self, recipe_name: str) -> bool:
+        return recipe_name in self.positions
+
+    def row(self, recipe_name: str) -> int:
+        """Return the ingredient bitset of a recipe."""
+        return self.rows[self.positions[recipe_name]]
+
+    def prep_per_ingredient(self, recipe_name: str) -> float:
+        """Share of a recipe's prep time spent on each of its ingredients."""
+        position = self.positions[recipe_name]
+        return self.prep_minutes[position] / max(1, self.sizes[position])
+
+    def cooccurrence(self, first: str, second: str) -> int:
+        """Number of recipes that use both ingredients."""
+        first_id = self.ingredient_ids.get(first)
+        second_id = self.ingredient_ids.get(second)
+        if first_id is None or second_id is None:
+            return 0
+        return (self.columns[first_id] & self.columns[second_id]).bit_count()
+
+    def recipe_mask(self, recipe_names: Iterable[str]) -> int:
+        """Bitset of the catalogue recipes among `recipe_names`."""
+        mask = 0
+        for name in recipe_names:
+            if name in self.positions:
+                mask |= 1 << self.positions[name]
+        return mask
+
+    def allowed(self, intent: MealIntent | None) -> int:
+        """Bitset of the catalogue recipes that fit an intent (all of them if there is none)."""
+        if intent is None:
+            return self.everything
+        mask = 0
+        for position, recipe in enumerate(self.catalogue):
+            if matches_intent(recipe, intent):
+                mask |= 1 << position
+        return mask
+
+    def with_tags(self, tags: Iterable[str]) -> int:
+        """Bitset of the catalogue recipes that have every one of `tags`."""
+        mask = self.everything
+        for tag in tags:
+            mask &= self.tag_masks.get(tag, 0)
+        return mask
+
+    def overlaps(self, ingredients: int) -> list[int]:
+        """Bit-sliced count of the `ingredients` each catalogue recipe uses."""
+        planes: list[int] = []
+        for column in _bits(ingredients):
+            _increment(planes, self.columns[column])
+        return planes
+
+
+def _plan_slots(plan: MealPlan, index: IngredientIndex) -> list[tuple[int, int]]:
+    """(day, meal) positions of the catalogue meals in a plan."""
+    return [
+        (day_index, meal_index)
+        for day_index, day in enumerate(plan.days)
+        for meal_index, meal in enumerate(day.meals)
+        if meal.recipe_name in index
+    ]
+
+
+def _leftover_slots(plan: MealPlan) -> set[tuple[int, int]]:
+    """(day, meal) positions of dinners eaten again as the next day's lunch, and those lunches."""
+    slots = set()
+    for day_index in range(len(plan.days) - 1):
+        for dinner_index, dinner in enumerate(plan.days[day_index].meals):
+            if dinner.meal_type.lower() != "dinner":
+                continue
+            for lunch_index, lunch in enumerate(plan.days[day_index + 1].meals):
+                if lunch.meal_type.lower() == "lunch" and lunch.recipe_name == dinner.recipe_name:
+                    slots |= {(day_index, dinner_index), (day_index + 1, lunch_index)}
+    return slots
+
+
+def _ingredient_counts(names: list[str], index: IngredientIndex) -> Counter[int]:
+    counts: Counter[int] = Counter()
+    for name in names:
+        counts.update(_bits(index.row(name)))
+    return counts
+
+
+def _batch_groups(
+    plan: MealPlan, index: IngredientIndex, window: int
+) -> list[tuple[str, list[tuple[int, str]]]]:
+    """Group distinct meals that share an ingredient within a window of consecutive days."""
+    meals_by_ingredient: dict[int, list[tuple[int, str]]] = {}
+    for day_index, day in enumerate(plan.days):
+        for meal in day.meals:
+            if meal.recipe_name in index:
+                for column in _bits(index.row(meal.recipe_name)):
+                    meals_by_ingredient.setdefault(column, []).append((day_index, meal.recipe_name))
+
+    groups = []
+    for column, meals in sorted(meals_by_ingredient.items()):
+        ingredient = index.ingredients[column]
+        group: list[tuple[int, str]] = []
+        for meal in meals:
+            if group and meal[0] - group[0][0] >= window:
+                if len(group) > 1:
+                    groups.append((ingredient, group))
+                group = []
+            # A recipe served twice is the same dish, not shared prep
+            if all(name != meal[1] for _, name in group):
+                group.append(meal)
+        if len(group) > 1:
+            groups.append((ingredient, group))
+    return groups
+
+
+def _prep_minutes(plan: MealPlan, index: IngredientIndex, batched: bool, window: int) -> int:
+    names = [plan.days[d].meals[m].recipe_name for d, m in _plan_slots(plan, index)]
+    total = sum(index.prep_minutes[index.positions[name]] for name in names)
+    if not batched:
+        return total
+    # A batch-prepped ingredient is only prepped once per group
+    saved = sum(
+        index.prep_per_ingredient(name)
+        for _, group in _batch_groups(plan, index, window)
+        for _, name in group[1:]
+    )
+    return round(total - saved)
+
+
+def optimize_plan(
+    plan: MealPlan,
+    index: IngredientIndex | None = None,
+    max_repeats: int = MAX_REPEATS,
+    window: int = BATCH_WINDOW_DAYS,
+    intent: MealIntent | None = None,
+    chunk_days: int | None = None,
+) -> PlanOptimization:
+    """Substitute catalogue meals to maximise ingredient reuse.
+
+    A meal is only replaced by a recipe that has all of its dietary tags, fits
+    `intent` (dietary constraints, cuisine and time limit) and isn't already
+    served that day, and no recipe appears more than `max_repeats` times (by
+    default, a substitute is always a dish the plan doesn't have yet).
+    Nothing is substituted when the query had constraints the intent parser
+    couldn't read, since a substitute might break them. Leftover pairs (a
+    dinner eaten again as the next day's lunch) and meals that aren't in the
+    catalogue are left alone. With `chunk_days`, a substitute is never a dish
+    already used in another chunk of the plan.
+    """
+    index = index or IngredientIndex()
+    plan = plan.model_copy(deep=True)
+    slots = _plan_slots(plan, index)
+    names = [plan.days[d].meals[m].recipe_name for d, m in slots]
+    counts = _ingredient_counts(names, index)
+    unique_before = len(counts)
+    prep_before = _prep_minutes(plan, index, batched=False, window=window)
+
+    allowed = index.allowed(intent)
+    fixed = _leftover_slots(plan)
+    chunk_of = [day // chunk_days if chunk_days else 0 for day, _ in slots]
+    # Number of plan ingredients each catalogue recipe uses, kept up to date on swaps
+    plan_overlap = index.overlaps(sum(1 << column for column in counts))
+
+    swaps = []
+    improved = intent is None or not intent.unparsed
+    while improved:
+        improved = False
+        for slot, (day_index, meal_index) in enumerate(slots):
+            if (day_index, meal_index) in fixed:
+                continue
+            current = names[slot]
+            current_row = index.row(current)
+            # Ingredients that would disappear if this meal were removed
+            only_here = sum(1 << column for column in _bits(current_row) if counts[column] == 1)
+            base = len(counts) - only_here.bit_count()
+
+            used = Counter(names)
+            blocked = {name for name, count in used.items() if count >= max_repeats}
+            blocked |= {meal.recipe_name for meal in plan.days[day_index].meals}
+            blocked |= {
+                name for other, name in enumerate(names) if chunk_of[other] != chunk_of[slot]
+            }
+            candidates = (
+                allowed
+                & index.with_tags(index.tags[index.positions[current]])
+                & ~index.recipe_mask(blocked)
+            )
+            if not candidates:
+                continue
+
+            # Score every candidate at once: the fewest new ingredients, then the most reused
+            overlap = _difference(plan_overlap, index.overlaps(only_here))
+            new_items = _difference(index.size_planes, overlap)
+            best_set = _highest(overlap, _lowest(new_items, candidates))
+            position = (best_set & -best_set).bit_length() - 1
+            if base + _count(new_items, position) >= len(counts):
+                continue
+            best = index.recipes[position]
+
+            before = set(counts)
+            counts.subtract(_bits(current_row))
+            counts.update(_bits(index.row(best)))
+            counts = +counts
+            for column in before - counts.keys():
+                _decrement(plan_overlap, index.columns[column])
+            for column in counts.keys() - before:
+                _increment(plan_overlap, index.columns[column])
+            names[slot] = best
+            meal = plan.days[day_index].meals[meal_index]
+            swaps.append(f"{plan.days[day_index].day} {meal.meal_type}: {current} -> {best}")
+            meal.recipe_name = best
+            improved = True
+
+    # Ingredients shared by the same meals are prepped together in one step
+    steps: dict[tuple[tuple[int, str], ...], list[str]] = {}
+    for ingredient, group in _batch_groups(plan, index, window):
+        steps.setdefault(tuple(group), []).append(ingredient)
+    batch_prep = [
+        f"Prep {', '.join(ingredients)} once for: "
+        + ", ".join(f"{plan.days[day].day} ({name})" for day, name in group)
+        for group, ingredients in steps.items()
+    ]
+    return PlanOptimization(
+        meal_plan=plan,
+        unique_items_before=unique_before,
+        unique_items_after=len(counts),
+        prep_minutes_before=prep_before,
+        prep_minutes_after=_prep_minutes(plan, index, batched=True, window=window),
+        swaps=swaps,
+        batch_prep=batch_prep,
+    )
@@ -0,0 +1,151 @@
+"""Helpers for planning long horizons in week-sized chunks.
+
+A 30-day plan is split into chunks that the planner agent generates in
+parallel, then merged back into a single `MealPlan`. Chunks share the same
+constraints: dishes are not repeated across chunks, and the last dinner of a
+chunk is carried over as the first lunch of the next one. Catalogue dishes are
+reserved for a single chunk up front, so chunks planned in parallel don't
+compete for them. Horizons are capped at MAX_PLAN_DAYS days.
+"""
+
+from .models import DayPlan, MealItem, MealPlan
+
+# Horizons longer than this are planned in chunks of CHUNK_DAYS days
+CHUNK_DAYS = 7
+
+# Longest horizon that will be planned, so one query can't fan out unbounded chunks
+MAX_PLAN_DAYS = 31
+
+
+def split_horizon(total_days: int, chunk_days: int = CHUNK_DAYS) -> list[tuple[int, int]]:
+    """Split a horizon into (first_day, num_days) chunks, with days numbered from 1."""
+    return [
+        (start, min(chunk_days, total_days - start + 1))
+        for start in range(1, total_days + 1, chunk_days)
+    ]
+
+
+def chunk_prompt(
+    query: str,
+    first_day: int,
+    num_days: int,
+    total_days: int,
+    excluded: list[str] | None = None,
+) -> str:
+    """Build the planner input for one chunk of a long plan."""
+    last_day = first_day + num_days - 1
+    lines = [
+        query,
+        "",
+        f"This is part of a {total_days}-day plan. Plan ONLY days {first_day} to {last_day} "
+        f"({num_days} days), labelled 'Day {first_day}' to 'Day {last_day}', with breakfast, "
+        f"lunch and dinner for each day. Set total_days to {num_days}.",
+    ]
+    if last_day < total_days:
+        lines.append(
+            f"Cook extra servings for dinner on Day {last_day}: the leftovers will be lunch "
+            f"on Day {last_day + 1}."
+        )
+    if first_day > 1:
+        lines.append(f"Lunch on Day {first_day} will be leftovers from the previous day's dinner.")
+    if excluded:
+        lines.append(
+            "These dishes are used in other parts of the plan, do not use them: "
+            + ", ".join(excluded)
+            + "."
+        )
+    return "\n".join(lines)
+
+
+def reserve_recipes(names: list[str], num_chunks: int) -> list[list[str]]:
+    """Give each chunk the dishes reserved for the other chunks.
+
+    Catalogue dishes are dealt out round-robin, so each one can only be used
+    by a single chunk. Returns the exclusion list for each chunk.
+    """
+    reserved = [sorted(names)[index::num_chunks] for index in range(num_chunks)]
+    return [
+        sorted(name for other, chunk in enumerate(reserved) if other != index for name in chunk)
+        for index in range(num_chunks)
+    ]
+
+
+def used_elsewhere(chunks: list[MealPlan], index: int) -> list[str]:
+    """Return the dishes used by every chunk except `index`."""
+    names: set[str] = set()
+    for other, chunk in enumerate(chunks):
+        if other != index:
+            names |= recipe_names(chunk)
+    return sorted(names)
+
+
+def recipe_names(plan: MealPlan) -> set[str]:
+    """Return the unique recipe names used in a plan."""
+    return {meal.recipe_name for day in plan.days for meal in day.meals}
+
+
+def repeated_recipes(chunks: list[MealPlan]) -> dict[int, set[str]]:
+    """Find, for each chunk, the dishes already used by an earlier chunk."""
+    repeats: dict[int, set[str]] = {}
+    seen: set[str] = set()
+    for index, chunk in enumerate(chunks):
+        names = recipe_names(chunk)
+        if names & seen:
+            repeats[index] = names & seen
+        seen |= names
+    return repeats
+
+
+def replace_repeats(chunks: list[MealPlan], candidates: list[str]) -> list[str]:
+    """Swap dishes repeated across chunks for unused candidates, in place.
+
+    Each repeat is replaced in the later chunk by the first candidate that no
+    chunk uses yet. Returns the repeated dishes left when candidates run out.
+    """
+    used: set[str] = set()
+    for chunk in chunks:
+        used |= recipe_names(chunk)
+    unused = [name for name in sorted(candidates) if name not in used]
+
+    unresolved: set[str] = set()
+    for index, names in sorted(repeated_recipes(chunks).items()):
+        for name in sorted(names):
+            if not unused:
+                unresolved.add(name)
+                continue
+            substitute = unused.pop(0)
+            for day in chunks[index].days:
+                for meal in day.meals:
+                    if meal.recipe_name == name:
+                        meal.recipe_name = substitute
+    return sorted(unresolved)
+
+
+def _find_meal(day: DayPlan, meal_type: str) -> MealItem | None:
+    return next((meal for meal in day.meals if meal.meal_type.lower() == meal_type), None)
+
+
+def merge_chunks(chunks: list[MealPlan]) -> MealPlan:
+    """Merge chunk plans into a single plan.
+
+    Days are renumbered, `total_days` is recomputed, and the last dinner of
+    each chunk is carried over as the first lunch of the next one.
+    """
+    days: list[DayPlan] = []
+    notes: list[str] = []
+    for chunk in chunks:
+        chunk_days = [day.model_copy(deep=True) for day in chunk.days]
+        if days and chunk_days:
+            dinner = _find_meal(days[-1], "dinner")
+            lunch = _find_meal(chunk_days[0], "lunch")
+            if dinner and lunch and lunch.recipe_name != dinner.recipe_name:
+                dinner.servings += lunch.servings
+                lunch.recipe_name = dinner.recipe_name
+        days.extend(chunk_days)
+        if chunk.dietary_notes and chunk.dietary_notes not in notes:
+            notes.append(chunk.dietary_notes)
+
+    for number, day in enumerate(days, start=1):
+        day.day = f"Day {number}"
+
+    return MealPlan(days=days, total_days=len(days), dietary_notes=" ".join(notes))
@@ -6,6 +6,8 @@ from rich.console import Console, Group
 from rich.live import Live
 from rich.spinner import Spinner
 
+from .models import MealPlan, PlanOptimization, RecipeSearchResult, ShoppingList
+
 
 class Printer:
     """Printer for displaying meal prep workflow progress."""
@@ -15,7 +17,9 @@ class Printer:
         self.live = Live(console=console)
         self.items: dict[str, tuple[str, bool]] = {}
         self.hide_done_ids: set[str] = set()
-        self.live.start()
+        # A quiet console renders nothing, so skip the live refresh thread
+        if not console.quiet:
+            self.live.start()
 
     def end(self) -> None:
         """Stop the live display."""
@@ -50,3 +54,79 @@ class Printer:
             else:
                 renderables.append(Spinner("dots", text=content))
         self.live.update(Group(*renderables))
+
+
+def print_results(
+    meal_plan: MealPlan,
+    recipes_found: RecipeSearchResult | None,
+    nutrition_analysis: str,
+    shopping_list: ShoppingList,
+    cooking_tips: str,
+    ingredient_reuse: PlanOptimization | None = None,
+) -> None:
+    """Print formatted results."""
+    print("\n" + "=" * 80)
+    print("MEAL PLAN")
+    print("=" * 80 + "\n")
+
+    for day in meal_plan.days:
+        print(f"\n{day.day}:")
+        for meal in day.meals:
+            print(f"  {meal.meal_type.capitalize()}: {meal.recipe_name} ({meal.servings} servings)")
+
+    if meal_plan.dietary_notes:
+        print(f"\nDietary Notes: {meal_plan.dietary_notes}")
+
+    print("\n" + "=" * 80)
+    print("NUTRITION ANALYSIS")
+    print("=" * 80 + "\n")
+    print(nutrition_analysis)
+
+    print("\n" + "=" * 80)
+    print("SHOPPING LIST")
+    print("=" * 80 + "\n")
+
+    if shopping_list.produce:
+        print("PRODUCE:")
+        for item in shopping_list.produce:
+            print(f"  • {item}")
+
+    if shopping_list.protein:
+        print("\nPROTEIN:")
+        for item in shopping_list.protein:
+            print(f"  • {item}")
+
+    if shopping_list.dairy:
+        print("\nDAIRY:")
+        for item in shopping_list.dairy:
+            print(f"  • {item}")
+
+    if shopping_list.pantry:
+        print("\nPANTRY:")
+        for item in shopping_list.pantry:
+            print(f"  • {item}")
+
+    if shopping_list.other:
+        print("\nOTHER:")
+        for item in shopping_list.other:
+            print(f"  • {item}")
+
+    if ingredient_reuse is not None:
+        print("\n" + "=" * 80)
+        print("BATCH PREP")
+        print("=" * 80 + "\n")
+        print(
+            f"Unique items: {ingredient_reuse.unique_items_before} -> "
+            f"{ingredient_reuse.unique_items_after}, prep time: "
+            f"{ingredient_reuse.prep_minutes_before} -> {ingredient_reuse.prep_minutes_after} min"
+        )
+        for swap in ingredient_reuse.swaps:
+            print(f"  ↻ {swap}")
+        for step in ingredient_reuse.batch_prep:
+            print(f"  • {step}")
+
+    print("\n" + "=" * 80)
+    print("COOKING TIPS")
+    print("=" * 80 + "\n")
+    print(cooking_tips)
+    print()
@@ -0,0 +1,467 @@
+"""Record and replay meal prep workflow runs.
+
+`SessionRecorder` appends every model request/response, tool call and timing
+of a `MealPrepManager.run` to a compact JSON Lines file. The replay runner
+feeds the recorded model responses back through the real manager and tools,
+so recorded traffic can be replayed offline as a load test or profiled
+without calling the model API.
+
+Record:
+    recorder = SessionRecorder("sessions.jsonl")
+    manager = MealPrepManager(recorder=recorder)
+
+Replay:
+    python -m examples.meal_prep.recording sessions.jsonl --speed recorded --concurrency 50
+
+Failed sessions are summarised by exception type and message; pass
+`--fail-fast` to stop at the first failure with its full traceback.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextvars
+import dataclasses
+import hashlib
+import json
+import queue
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from collections.abc import AsyncIterator, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from pydantic import BaseModel, Field, TypeAdapter
+
+from agents import (
+    Agent,
+    Model,
+    ModelProvider,
+    ModelResponse,
+    OpenAIProvider,
+    RunConfig,
+    RunContextWrapper,
+    RunHooks,
+    Tool,
+    Usage,
+)
+from agents.items import TResponseOutputItem
+
+from .manager import MealPrepManager, MealPrepResult
+
+_OUTPUT_ITEM = TypeAdapter(TResponseOutputItem)
+
+# Session id of the run the current task belongs to
+_current_session: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+    "meal_prep_session", default=None
+)
+
+
+class ReplayError(RuntimeError):
+    """Raised when a replayed run asks for a model response that wasn't recorded."""
+
+
+def request_key(system_instructions: str | None, input: Any) -> str:
+    """Hash a model request so replayed requests can be matched to recorded ones."""
+    payload = json.dumps([system_instructions, input], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:24]
+
+
+def _instructions_key(system_instructions: str | None) -> str:
+    return request_key(system_instructions, None)
+
+
+def _dump_response(response: ModelResponse) -> dict[str, Any]:
+    usage = response.usage
+    return {
+        "output": [item.model_dump(mode="json", exclude_none=True) for item in response.output],
+        "usage": [usage.requests, usage.input_tokens, usage.output_tokens, usage.total_tokens],
+        "response_id": response.response_id,
+    }
+
+
+def _load_response(data: dict[str, Any]) -> ModelResponse:
+    requests, input_tokens, output_tokens, total_tokens = data["usage"]
+    return ModelResponse(
+        output=[_OUTPUT_ITEM.validate_python(item) for item in data["output"]],
+        usage=Usage(
+            requests=requests,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            total_tokens=total_tokens,
+        ),
+        response_id=data.get("response_id"),
+    )
+
+
+class SessionRecorder:
+    """Appends the events of recorded runs to a JSON Lines file.
+
+    One recorder can be shared by concurrent runs; each event is tagged with
+    the session it belongs to. Events are written by a background thread so
+    recording never blocks the event loop; `close()` writes out the rest.
+    """
+
+    def __init__(self, path: str, provider: ModelProvider | None = None) -> None:
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+        self._starts: dict[str, float] = {}
+        self.provider = RecordingModelProvider(self, provider or OpenAIProvider())
+        self.hooks = RecordingHooks(self)
+
+        self._events: queue.SimpleQueue[dict[str, Any] | None] = queue.SimpleQueue()
+        self._writer = threading.Thread(
+            target=self._write_events, name="session-recorder", daemon=True
+        )
+        self._writer.start()
+
+    def run_config(self, run_config: RunConfig | None = None) -> RunConfig:
+        """Return a run config that records every model call.
+
+        If `run_config` is given, its model provider is wrapped, so calls still
+        go to that provider and keep the rest of its settings.
+        """
+        if run_config is None:
+            return RunConfig(model_provider=self.provider)
+        provider = RecordingModelProvider(self, run_config.model_provider)
+        return dataclasses.replace(run_config, model_provider=provider)
+
+    @contextmanager
+    def session(self, query: str) -> Iterator[str]:
+        """Record the events of one workflow run."""
+        session_id = uuid.uuid4().hex[:12]
+        token = _current_session.set(session_id)
+        self._starts[session_id] = time.perf_counter()
+        self.record("session", query=query, started_at=time.time())
+        try:
+            yield session_id
+        finally:
+            self.record("end")
+            _current_session.reset(token)
+            del self._starts[session_id]
+
+    def record(self, event_type: str, **data: Any) -> None:
+        """Queue an event for the current session.
+
+        Events from tasks that outlive their session (e.g. a tool call that
+        finishes after the run was cancelled) are dropped.
+        """
+        session_id = _current_session.get()
+        start = self._starts.get(session_id) if session_id is not None else None
+        if start is None:
+            return
+        offset = time.perf_counter() - start
+        self._events.put({"type": event_type, "session": session_id, "t": round(offset, 4), **data})
+
+    def _write_events(self) -> None:
+        while (event := self._events.get()) is not None:
+            self._file.write(json.dumps(event, separators=(",", ":"), default=str) + "\n")
+            if self._events.empty():
+                self._file.flush()
+
+    def close(self) -> None:
+        """Write out the queued events and close the file."""
+        if self._file.closed:
+            return
+        self._events.put(None)
+        self._writer.join()
+        self._file.close()
+
+
+class RecordingModel(Model):
+    """Model wrapper that records each request and response."""
+
+    def __init__(self, recorder: SessionRecorder, model: Model, name: str | None) -> None:
+        self.recorder = recorder
+        self.model = model
+        self.name = name
+
+    async def get_response(
+        self, system_instructions: str | None, input: Any, *args: Any, **kwargs: Any
+    ) -> ModelResponse:
+        start = time.perf_counter()
+        response = await self.model.get_response(system_instructions, input, *args, **kwargs)
+        self.recorder.record(
+            "model",
+            model=self.name,
+            key=request_key(system_instructions, input),
+            instructions=_instructions_key(system_instructions),
+            duration=round(time.perf_counter() - start, 4),
+            response=_dump_response(response),
+        )
+        return response
+
+    def stream_response(
+        self, system_instructions: str | None, input: Any, *args: Any, **kwargs: Any
+    ) -> AsyncIterator[Any]:
+        # The workflow doesn't stream, so streamed calls are passed through unrecorded
+        return self.model.stream_response(system_instructions, input, *args, **kwargs)
+
+
+class RecordingModelProvider(ModelProvider):
+    """Provider that wraps every model in a `RecordingModel`."""
+
+    def __init__(self, recorder: SessionRecorder, provider: ModelProvider) -> None:
+        self.recorder = recorder
+        self.provider = provider
+
+    def get_model(self, model_name: str | None) -> Model:
+        return RecordingModel(self.recorder, self.provider.get_model(model_name), model_name)
+
+
+class RecordingHooks(RunHooks[Any]):
+    """Run hooks that record tool calls with their arguments and timing."""
+
+    def __init__(self, recorder: SessionRecorder) -> None:
+        self.recorder = recorder
+        self._starts: dict[tuple[str | None, str], float] = {}
+
+    def _call_key(self, context: RunContextWrapper[Any], tool: Tool) -> tuple[str | None, str]:
+        return _current_session.get(), getattr(context, "tool_call_id", tool.name)
+
+    async def on_tool_start(
+        self, context: RunContextWrapper[Any], agent: Agent[Any], tool: Tool
+    ) -> None:
+        self._starts[self._call_key(context, tool)] = time.perf_counter()
+
+    async def on_tool_end(
+        self, context: RunContextWrapper[Any], agent: Agent[Any], tool: Tool, result: Any
+    ) -> None:
+        start = self._starts.pop(self._call_key(context, tool), None)
+        self.recorder.record(
+            "tool",
+            agent=agent.name,
+            tool=tool.name,
+            arguments=getattr(context, "tool_arguments", None),
+            duration=round(time.perf_counter() - start, 4) if start is not None else None,
+            output_size=len(str(result)),
+        )
+
+
+class RecordedSession(BaseModel):
+    """The recorded events of one workflow run."""
+
+    session: str
+    query: str
+    cache_hit: bool = False
+    duration: float = 0.0
+    model_calls: list[dict[str, Any]] = Field(default_factory=list)
+    tool_calls: list[dict[str, Any]] = Field(default_factory=list)
+
+
+def load_sessions(path: str) -> list[RecordedSession]:
+    """Read the complete sessions from a recording file."""
+    sessions: dict[str, RecordedSession] = {}
+    complete: list[RecordedSession] = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            event = json.loads(line)
+            session_id = event["session"]
+            if event["type"] == "session":
+                sessions[session_id] = RecordedSession(session=session_id, query=event["query"])
+                continue
+            session = sessions.get(session_id)
+            if session is None:
+                continue
+            if event["type"] == "model":
+                session.model_calls.append(event)
+            elif event["type"] == "tool":
+                session.tool_calls.append(event)
+            elif event["type"] == "cache_hit":
+                session.cache_hit = True
+            elif event["type"] == "end":
+                session.duration = event["t"]
+                complete.append(sessions.pop(session_id))
+    return complete
+
+
+class ReplayModel(Model):
+    """Model that answers requests with recorded responses."""
+
+    def __init__(self, provider: ReplayModelProvider, name: str | None) -> None:
+        self.provider = provider
+        self.name = name
+
+    async def get_response(
+        self, system_instructions: str | None, input: Any, *args: Any, **kwargs: Any
+    ) -> ModelResponse:
+        event = self.provider.next_response(system_instructions, input)
+        if self.provider.speed == "recorded":
+            await asyncio.sleep(event["duration"])
+        return _load_response(event["response"])
+
+    def stream_response(
+        self, system_instructions: str | None, input: Any, *args: Any, **kwargs: Any
+    ) -> AsyncIterator[Any]:
+        raise ReplayError("Streaming responses can't be replayed")
+
+
+class ReplayModelProvider(ModelProvider):
+    """Provider that serves the recorded model responses of one session.
+
+    Requests are matched on their instructions and input. If the input
+    differs (e.g. a tool returned something else), the next response recorded
+    for the same agent instructions is used instead.
+    """
+
+    def __init__(self, session: RecordedSession, speed: str = "full") -> None:
+        self.speed = speed
+        self._by_key: dict[str, deque[dict[str, Any]]] = defaultdict(deque)
+        self._by_instructions: dict[str, deque[dict[str, Any]]] = defaultdict(deque)
+        for event in session.model_calls:
+            self._by_key[event["key"]].append(event)
+            self._by_instructions[event["instructions"]].append(event)
+
+    def next_response(self, system_instructions: str | None, input: Any) -> dict[str, Any]:
+        by_key = self._by_key[request_key(system_instructions, input)]
+        by_instructions = self._by_instructions[_instructions_key(system_instructions)]
+        event = by_key.popleft() if by_key else None
+        if event is None:
+            if not by_instructions:
+                agent = (system_instructions or "").split("\n", 1)[0][:80]
+                raise ReplayError(f"No recorded response left for a request to: {agent!r}")
+            event = by_instructions[0]
+            self._by_key[event["key"]].remove(event)
+        by_instructions.remove(event)
+        return event
+
+    def get_model(self, model_name: str | None) -> Model:
+        return ReplayModel(self, model_name)
+
+
+class ReplayFailure(BaseModel):
+    """A session that failed to replay."""
+
+    session: str
+    query: str
+    error_type: str
+    message: str
+
+
+class ReplayStats(BaseModel):
+    """Summary of a replay run."""
+
+    sessions: int = 0
+    skipped: int = 0
+    failed: int = 0
+    wall_time: float = 0.0
+    latencies: list[float] = Field(default_factory=list)
+    failures: list[ReplayFailure] = Field(default_factory=list)
+
+    def failure_summary(self) -> list[tuple[int, ReplayFailure]]:
+        """Group failures by exception type and message, most frequent first.
+
+        Each group is returned as its count and its first failure.
+        """
+        groups: dict[tuple[str, str], list[ReplayFailure]] = {}
+        for failure in self.failures:
+            groups.setdefault((failure.error_type, failure.message), []).append(failure)
+        return sorted(
+            ((len(group), group[0]) for group in groups.values()), key=lambda item: -item[0]
+        )
+
+    def percentile(self, p: float) -> float:
+        """Return the p-th percentile (0-100) of session latencies."""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+async def replay_session(session: RecordedSession, speed: str = "full") -> MealPrepResult:
+    """Replay one recorded session through the real manager and tools."""
+    manager = MealPrepManager(
+        run_config=RunConfig(
+            model_provider=ReplayModelProvider(session, speed), tracing_disabled=True
+        ),
+        use_cache=False,
+        quiet=True,
+    )
+    return await manager.run(session.query)
+
+
+async def replay_sessions(
+    sessions: list[RecordedSession],
+    speed: str = "full",
+    concurrency: int = 10,
+    fail_fast: bool = False,
+) -> ReplayStats:
+    """Replay many sessions concurrently and collect latency statistics.
+
+    Sessions served from the plan cache made no model calls and are skipped.
+    Failures are recorded in `failures`; with `fail_fast` the first one is
+    raised instead and the remaining replays are cancelled.
+    """
+    stats = ReplayStats()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def replay(session: RecordedSession) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await replay_session(session, speed)
+            except Exception as e:
+                if fail_fast:
+                    raise
+                stats.failed += 1
+                stats.failures.append(
+                    ReplayFailure(
+                        session=session.session,
+                        query=session.query,
+                        error_type=type(e).__name__,
+                        message=str(e),
+                    )
+                )
+                return
+            stats.latencies.append(time.perf_counter() - start)
+
+    runnable = [session for session in sessions if not session.cache_hit]
+    stats.sessions = len(runnable)
+    stats.skipped = len(sessions) - len(runnable)
+    start = time.perf_counter()
+    tasks = [asyncio.create_task(replay(session)) for session in runnable]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+    stats.wall_time = time.perf_counter() - start
+    return stats
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay recorded meal prep sessions.")
+    parser.add_argument("path", help="Recording file written by SessionRecorder")
+    parser.add_argument("--speed", choices=["full", "recorded"], default="full")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=1, help="Replay every session N times")
+    parser.add_argument(
+        "--fail-fast", action="store_true", help="Stop at the first failed session and raise"
+    )
+    args = parser.parse_args()
+
+    sessions = load_sessions(args.path) * args.repeat
+    stats = await replay_sessions(sessions, args.speed, args.concurrency, args.fail_fast)
+    print(
+        f"Replayed {stats.sessions} sessions ({stats.skipped} cache hits skipped, "
+        f"{stats.failed} failed) in {stats.wall_time:.2f}s"
+    )
+    print(
+        f"p50 {stats.percentile(50) * 1000:.1f}ms  "
+        f"p95 {stats.percentile(95) * 1000:.1f}ms  "
+        f"p99 {stats.percentile(99) * 1000:.1f}ms"
+    )
+    if stats.failures:
+        print("\nFailures:")
+        for count, failure in stats.failure_summary():
+            print(f"  {count}x {failure.error_type}: {failure.message}")
+            print(f"      e.g. session {failure.session} ({failure.query!r})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
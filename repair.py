@@ -0,0 +1,168 @@
+"""Local validation and repair of structured agent outputs.
+
+Most problems in a generated `MealPlan` or `ShoppingList` can be fixed
+without calling a model: derived counts are recomputed and recipe names that
+differ from a catalogue entry only cosmetically are snapped to it. Only the
+days that can't be fixed locally are reported, so the manager can send just
+those days back to the model instead of regenerating the whole plan. The
+meals each day needs are taken from the query, or else from the meals most
+days of the plan have, so only days that deviate are sent back.
+"""
+
+import re
+from collections import Counter
+from collections.abc import Iterable, Mapping
+from functools import lru_cache
+
+from .models import DayPlan, MealPlan, ShoppingList
+from .tools import RECIPE_DATABASE, Recipe
+
+# Meals a day needs when neither the query nor the plan says otherwise
+REQUIRED_MEALS = ("breakfast", "lunch", "dinner")
+MEAL_TYPES = ("breakfast", "brunch", "lunch", "dinner", "snack")
+_MEAL_TYPE_RE = re.compile(r"\b(" + "|".join(MEAL_TYPES) + r")(?:e?s)?\b", re.IGNORECASE)
+DEFAULT_SERVINGS = 2
+
+# Words ignored when comparing recipe names
+NAME_STOPWORDS = frozenset({"a", "an", "and", "the", "with", "of"})
+
+SHOPPING_CATEGORIES = ("produce", "protein", "dairy", "pantry", "other")
+
+
+def _singular(word: str) -> str:
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    if word.endswith(("ches", "shes", "oes", "sses")):
+        return word[:-2]
+    if word.endswith("s") and not word.endswith("ss") and len(word) > 3:
+        return word[:-1]
+    return word
+
+
+@lru_cache(maxsize=16384)
+def name_tokens(name: str) -> frozenset[str]:
+    """Reduce a recipe name to the set of its words, ignoring case, plurals and punctuation."""
+    words = re.findall(r"[a-z0-9]+", name.lower().replace("&", " and "))
+    return frozenset(_singular(word) for word in words if word not in NAME_STOPWORDS)
+
+
+def snap_recipe_name(
+    name: str,
+    catalogue: Mapping[str, Recipe] | None = None,
+    dietary: Iterable[str] = (),
+) -> str:
+    """Return the catalogue name `name` refers to, or `name` unchanged.
+
+    Names are only snapped when they differ from a catalogue entry cosmetically
+    (case, plurals, punctuation or word order, e.g. "beef taco" -> "Beef Tacos"),
+    and never to a recipe that lacks any of the `dietary` tags requested.
+    """
+    catalogue = RECIPE_DATABASE if catalogue is None else catalogue
+    stripped = name.strip()
+    if stripped in catalogue:
+        return stripped
+
+    tokens = name_tokens(stripped)
+    required = {tag.lower() for tag in dietary}
+    for candidate, recipe in catalogue.items():
+        if name_tokens(candidate) != tokens:
+            continue
+        if required <= {tag.lower() for tag in recipe.dietary_tags}:
+            return candidate
+    return stripped
+
+
+def _meal_order(meal_type: str) -> tuple[int, str]:
+    known = MEAL_TYPES.index(meal_type) if meal_type in MEAL_TYPES else len(MEAL_TYPES)
+    return known, meal_type
+
+
+def required_meals(days: list[DayPlan], query: str | None = None) -> tuple[str, ...]:
+    """Return the meal types every day of a plan should have.
+
+    Meal types named in the query (e.g. "dinners for 5 days") win. Otherwise
+    a meal type is required if more than half of the days with meals have it.
+    """
+    if query:
+        named = {match.lower() for match in _MEAL_TYPE_RE.findall(query)}
+        if named:
+            return tuple(meal_type for meal_type in MEAL_TYPES if meal_type in named)
+
+    planned = [{meal.meal_type for meal in day.meals} for day in days if day.meals]
+    if not planned:
+        return REQUIRED_MEALS
+    counts = Counter(meal_type for meal_types in planned for meal_type in meal_types)
+    majority = [meal_type for meal_type, count in counts.items() if count * 2 > len(planned)]
+    return tuple(sorted(majority, key=_meal_order))
+
+
+def day_problems(day: DayPlan, required: Iterable[str] = REQUIRED_MEALS) -> list[str]:
+    """List the problems in a day that can't be repaired locally."""
+    problems = []
+    if not day.meals:
+        problems.append("the day has no meals")
+    meal_types = {meal.meal_type for meal in day.meals}
+    for meal_type in required:
+        if day.meals and meal_type not in meal_types:
+            problems.append(f"missing {meal_type}")
+    if any(not meal.recipe_name for meal in day.meals):
+        problems.append("a meal has no recipe name")
+    return problems
+
+
+def repair_day(
+    day: DayPlan,
+    catalogue: Mapping[str, Recipe] | None = None,
+    dietary: Iterable[str] = (),
+) -> DayPlan:
+    """Fix the fields of a day that can be repaired without a model."""
+    catalogue = RECIPE_DATABASE if catalogue is None else catalogue
+    day = day.model_copy(deep=True)
+    for meal in day.meals:
+        meal.meal_type = meal.meal_type.strip().lower()
+        if meal.recipe_name:
+            meal.recipe_name = snap_recipe_name(meal.recipe_name, catalogue, dietary)
+        if meal.servings < 1:
+            meal.servings = DEFAULT_SERVINGS
+    return day
+
+
+def repair_meal_plan(
+    plan: MealPlan,
+    catalogue: Mapping[str, Recipe] | None = None,
+    dietary: Iterable[str] = (),
+    query: str | None = None,
+) -> tuple[MealPlan, dict[int, list[str]]]:
+    """Repair a meal plan locally.
+
+    `dietary` lists the tags the user asked for; recipe names are never
+    snapped to catalogue entries without them. `query` is used to tell which
+    meals each day needs (see `required_meals`). Returns the repaired plan and,
+    for each day that still needs the model, its index and the problems found.
+    """
+    catalogue = RECIPE_DATABASE if catalogue is None else catalogue
+    dietary = list(dietary)
+    days = [repair_day(day, catalogue, dietary) for day in plan.days]
+    required = required_meals(days, query)
+    broken = {
+        index: problems
+        for index, day in enumerate(days)
+        if (problems := day_problems(day, required))
+    }
+    repaired = plan.model_copy(update={"days": days, "total_days": len(days)})
+    return repaired, broken
+
+
+def repair_shopping_list(shopping_list: ShoppingList) -> ShoppingList:
+    """Drop blank and duplicate items and recompute `total_items`."""
+    seen: set[str] = set()
+    categories: dict[str, list[str]] = {}
+    for category in SHOPPING_CATEGORIES:
+        items = []
+        for item in getattr(shopping_list, category):
+            item = item.strip()
+            if item and item.lower() not in seen:
+                seen.add(item.lower())
+                items.append(item)
+        categories[category] = items
+    return ShoppingList(**categories, total_items=len(seen))
@@ -0,0 +1,128 @@
+"""Model routing for the meal prep workflow.
+
+Each workflow stage gets its own model. Simple stages (shopping categorisation,
+cooking tips) run on a fast, cheap model, while the planner keeps the strong
+model. The manager escalates a stage to the strong model only when its
+structured output fails validation.
+"""
+
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Fast and strong model of each named preset (MEAL_PREP_MODEL_PRESET). The
+# "sdk" preset runs every stage on the SDK default model, as before routing.
+MODEL_PRESETS: dict[str, tuple[str | None, str | None]] = {
+    "openai": ("gpt-4.1-mini", "gpt-4.1"),
+    "sdk": (None, None),
+}
+DEFAULT_PRESET = "openai"
+MODEL_PRESET = os.getenv("MEAL_PREP_MODEL_PRESET") or DEFAULT_PRESET
+
+if MODEL_PRESET not in MODEL_PRESETS:
+    logger.warning("Unknown MEAL_PREP_MODEL_PRESET %r, using %r", MODEL_PRESET, DEFAULT_PRESET)
+    MODEL_PRESET = DEFAULT_PRESET
+
+# Models used for the two tiers. MEAL_PREP_MODEL is kept as the strong model
+# so existing overrides keep applying to the planner. A tier that is neither
+# set nor given by the preset uses the SDK default model.
+FAST_MODEL = os.getenv("MEAL_PREP_FAST_MODEL") or MODEL_PRESETS[MODEL_PRESET][0]
+STRONG_MODEL = (
+    os.getenv("MEAL_PREP_STRONG_MODEL")
+    or os.getenv("MEAL_PREP_MODEL")
+    or MODEL_PRESETS[MODEL_PRESET][1]
+)
+
+_warned_inactive = False
+
+# Latency/cost budget: "low" (fast model everywhere), "balanced" or "quality"
+# (strong model everywhere).
+DEFAULT_BUDGET = os.getenv("MEAL_PREP_BUDGET") or "balanced"
+
+STAGES = ("planner", "repair", "recipe", "nutrition", "shopping", "cooking")
+
+# Default tier for each stage under the "balanced" budget
+STAGE_TIERS = {
+    "planner": "strong",
+    "repair": "fast",
+    "recipe": "fast",
+    "nutrition": "fast",
+    "shopping": "fast",
+    "cooking": "fast",
+}
+
+# Stages that move to the strong model once a plan has this many unique recipes
+LARGE_PLAN_STAGES = ("recipe", "nutrition")
+LARGE_PLAN_RECIPES = 12
+
+
+def _stage_overrides() -> dict[str, str]:
+    """Read per-stage model overrides (e.g. MEAL_PREP_SHOPPING_MODEL)."""
+    overrides = {}
+    for stage in STAGES:
+        model = os.getenv(f"MEAL_PREP_{stage.upper()}_MODEL")
+        if model:
+            overrides[stage] = model
+    return overrides
+
+
+class ModelRouter:
+    """Picks a model for each workflow stage from plan size and budget."""
+
+    def __init__(
+        self,
+        budget: str = DEFAULT_BUDGET,
+        fast_model: str | None = FAST_MODEL,
+        strong_model: str | None = STRONG_MODEL,
+        stage_models: dict[str, str] | None = None,
+        large_plan_recipes: int = LARGE_PLAN_RECIPES,
+    ) -> None:
+        if budget not in ("low", "balanced", "quality"):
+            raise ValueError(f"Unknown model budget: {budget!r}")
+        self.budget = budget
+        self.fast_model = fast_model
+        self.strong_model = strong_model
+        self.stage_models = stage_models if stage_models is not None else _stage_overrides()
+        self.large_plan_recipes = large_plan_recipes
+        self._warn_if_inactive()
+
+    def _warn_if_inactive(self) -> None:
+        """Warn once per process when both tiers are the same model, so routing does nothing."""
+        global _warned_inactive
+        if _warned_inactive or self.fast_model != self.strong_model:
+            return
+        _warned_inactive = True
+        logger.warning(
+            "Model routing is inactive: the fast and strong tiers are both %s. Set "
+            "MEAL_PREP_MODEL_PRESET=openai or MEAL_PREP_FAST_MODEL/MEAL_PREP_STRONG_MODEL "
+            "to route stages by cost.",
+            self.fast_model or "the SDK default model",
+        )
+
+    def select(self, stage: str, plan_size: int = 0) -> str | None:
+        """Select the model for a stage.
+
+        `plan_size` is the number of unique recipes the stage has to handle.
+        Returns None when the stage should use the SDK default model.
+        """
+        if stage in self.stage_models:
+            return self.stage_models[stage]
+        if self.budget == "low":
+            return self.fast_model
+        if self.budget == "quality":
+            return self.strong_model
+
+        tier = STAGE_TIERS.get(stage, "strong")
+        if stage in LARGE_PLAN_STAGES and plan_size >= self.large_plan_recipes:
+            tier = "strong"
+        return self.strong_model if tier == "strong" else self.fast_model
+
+    def escalate(self, model: str | None) -> str | None:
+        """Return a stronger model to retry with, or None if there is none.
+
+        Nothing is escalated when no strong model is configured.
+        """
+        if self.strong_model is None or model == self.strong_model:
+            return None
+        return self.strong_model
@@ -0,0 +1,344 @@
+"""Long-running meal prep service.
+
+Hosts a single warm `MealPrepManager` behind a small HTTP server (TCP or Unix
+socket). The recipe catalogue, ingredient index, plan cache and a pooled
+keep-alive model client are built once at startup, so each request only pays
+for the real work.
+
+Endpoints:
+    POST /run      {"query": "..."} -> MealPrepResult as JSON
+    GET  /health   liveness and draining status
+    GET  /metrics  request counters, queue depth and latency percentiles
+
+Admission control bounds the number of concurrent runs and the queue behind
+them; requests beyond that get a 503. Oversized bodies get a 413, and
+malformed requests, or ones with too many or too long header lines, a 400. On SIGTERM/SIGINT the service stops
+accepting connections and drains in-flight runs before exiting.
+
+Run:
+    python -m examples.meal_prep.service --port 8765
+    python -m examples.meal_prep.service --socket /tmp/meal_prep.sock
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import time
+from collections import deque
+from http import HTTPStatus
+from typing import Any
+
+import httpx
+from openai import AsyncOpenAI
+
+from agents import set_default_openai_client
+
+# Import config to set up API key
+from . import config
+
+from .manager import MealPrepManager
+from .recording import SessionRecorder
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Latencies kept for the metrics percentiles
+LATENCY_WINDOW = 1000
+
+# Limits on what a client may send in one request
+MAX_BODY_BYTES = 64 * 1024
+MAX_HEADERS = 100
+MAX_LINE_BYTES = 8 * 1024
+
+
+class BadRequest(Exception):
+    """A request that is refused before it is read in full; the connection is then closed."""
+
+    def __init__(self, status: HTTPStatus, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def create_model_client(max_connections: int = 32) -> AsyncOpenAI | None:
+    """Create a model API client that keeps its HTTP connections alive between runs."""
+    api_key = getattr(config, "API_KEY", None) or os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        return None
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=120,
+        ),
+        timeout=httpx.Timeout(600, connect=10),
+    )
+    return AsyncOpenAI(api_key=api_key, http_client=http_client)
+
+
+class MealPrepService:
+    """HTTP service that runs meal prep workflows on a shared, warm manager."""
+
+    def __init__(
+        self,
+        manager: MealPrepManager,
+        max_concurrency: int = 8,
+        max_queue: int = 32,
+    ) -> None:
+        self.manager = manager
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.draining = False
+
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._admitted = 0
+        self._in_flight = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._connections: set[asyncio.StreamWriter] = set()
+        self._server: asyncio.AbstractServer | None = None
+
+        self.started_at = time.time()
+        self.requests_total = 0
+        self.rejected_total = 0
+        self.failed_total = 0
+        self.latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    async def start(
+        self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, socket_path: str | None = None
+    ) -> None:
+        """Load the recipe catalogue and start accepting connections."""
+        await self.manager.load_catalogue()
+        if socket_path:
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)  # Left over from a previous run
+            self._server = await asyncio.start_unix_server(
+                self._handle_connection, path=socket_path, limit=MAX_LINE_BYTES
+            )
+        else:
+            self._server = await asyncio.start_server(
+                self._handle_connection, host, port, limit=MAX_LINE_BYTES
+            )
+
+    async def drain(self, timeout: float = 300) -> None:
+        """Stop accepting work and wait for in-flight runs to finish."""
+        self.draining = True
+        if self._server is not None:
+            self._server.close()
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        for writer in list(self._connections):
+            writer.close()
+        if self._server is not None:
+            await self._server.wait_closed()
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Serve HTTP/1.1 requests on one connection, keeping it alive between requests."""
+        self._connections.add(writer)
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except BadRequest as e:
+                    self._write_response(writer, e.status, {"error": str(e)}, keep_alive=False)
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+
+                status, payload = await self._dispatch(method, path.split("?")[0], body)
+                keep_alive = headers.get("connection", "").lower() != "close" and not self.draining
+                self._write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+    async def _read_request(
+        self, reader: asyncio.StreamReader
+    ) -> tuple[str, str, dict[str, str], bytes] | None:
+        """Read one request, or return None when the client has closed the connection."""
+        request_line = await self._read_line(reader)
+        if not request_line:
+            return None
+        try:
+            method, path, _ = request_line.decode("latin-1").split(" ", 2)
+        except ValueError:
+            raise BadRequest(HTTPStatus.BAD_REQUEST, "Malformed request line") from None
+
+        headers: dict[str, str] = {}
+        while True:
+            line = await self._read_line(reader)
+            if line in (b"\r\n", b"\n", b""):
+                break
+            if len(headers) >= MAX_HEADERS:
+                raise BadRequest(HTTPStatus.BAD_REQUEST, f"More than {MAX_HEADERS} headers")
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise BadRequest(HTTPStatus.BAD_REQUEST, "Invalid Content-Length") from None
+        if length < 0:
+            raise BadRequest(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise BadRequest(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                f"Request body is limited to {MAX_BODY_BYTES} bytes",
+            )
+        return method, path, headers, await reader.readexactly(length)
+
+    @staticmethod
+    async def _read_line(reader: asyncio.StreamReader) -> bytes:
+        try:
+            return await reader.readline()
+        except ValueError:
+            # The line is longer than the stream limit
+            raise BadRequest(
+                HTTPStatus.BAD_REQUEST, f"Request line or header over {MAX_LINE_BYTES} bytes"
+            ) from None
+
+    def _write_response(
+        self,
+        writer: asyncio.StreamWriter,
+        status: HTTPStatus,
+        payload: dict[str, Any],
+        keep_alive: bool,
+    ) -> None:
+        body = json.dumps(payload).encode()
+        headers = [
+            f"HTTP/1.1 {status.value} {status.phrase}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        if status == HTTPStatus.SERVICE_UNAVAILABLE:
+            headers.append("Retry-After: 5")
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + body)
+
+    async def _dispatch(
+        self, method: str, path: str, body: bytes
+    ) -> tuple[HTTPStatus, dict[str, Any]]:
+        if method == "GET" and path == "/health":
+            status = HTTPStatus.SERVICE_UNAVAILABLE if self.draining else HTTPStatus.OK
+            return status, {"status": "draining" if self.draining else "ok"}
+        if method == "GET" and path == "/metrics":
+            return HTTPStatus.OK, self.metrics()
+        if method == "POST" and path == "/run":
+            return await self._run(body)
+        return HTTPStatus.NOT_FOUND, {"error": f"No route for {method} {path}"}
+
+    async def _run(self, body: bytes) -> tuple[HTTPStatus, dict[str, Any]]:
+        """Run a workflow, subject to admission control."""
+        try:
+            query = json.loads(body)["query"]
+        except (ValueError, KeyError, TypeError):
+            return HTTPStatus.BAD_REQUEST, {"error": 'Expected a JSON body like {"query": "..."}'}
+
+        self.requests_total += 1
+        if self.draining:
+            self.rejected_total += 1
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"error": "Service is draining"}
+        if self._admitted >= self.max_concurrency + self.max_queue:
+            self.rejected_total += 1
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"error": "Request queue is full"}
+
+        self._admitted += 1
+        self._idle.clear()
+        try:
+            async with self._slots:
+                self._in_flight += 1
+                start = time.perf_counter()
+                try:
+                    result = await self.manager.run(query)
+                except Exception as e:
+                    self.failed_total += 1
+                    return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)}
+                finally:
+                    self._in_flight -= 1
+                self.latencies.append(time.perf_counter() - start)
+                return HTTPStatus.OK, result.model_dump(mode="json")
+        finally:
+            self._admitted -= 1
+            if self._admitted == 0:
+                self._idle.set()
+
+    def metrics(self) -> dict[str, Any]:
+        """Return request counters, queue depth and latency percentiles."""
+        ordered = sorted(self.latencies)
+
+        def percentile(p: float) -> float | None:
+            if not ordered:
+                return None
+            return round(ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))], 3)
+
+        return {
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "draining": self.draining,
+            "in_flight": self._in_flight,
+            "queued": self._admitted - self._in_flight,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "requests_total": self.requests_total,
+            "rejected_total": self.rejected_total,
+            "failed_total": self.failed_total,
+            "latency_p50_seconds": percentile(50),
+            "latency_p95_seconds": percentile(95),
+            "latency_p99_seconds": percentile(99),
+        }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the meal prep service.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--socket", help="Listen on a Unix socket instead of TCP")
+    parser.add_argument("--max-concurrency", type=int, default=8)
+    parser.add_argument("--max-queue", type=int, default=32)
+    parser.add_argument("--record", help="Record every run to this file for offline replay")
+    args = parser.parse_args()
+
+    client = create_model_client(max_connections=args.max_concurrency * 4)
+    if client is not None:
+        set_default_openai_client(client)
+
+    recorder = SessionRecorder(args.record) if args.record else None
+    service = MealPrepService(
+        MealPrepManager(
+            recorder=recorder, quiet=True, chunk_concurrency=args.max_concurrency * 2
+        ),
+        max_concurrency=args.max_concurrency,
+        max_queue=args.max_queue,
+    )
+    await service.start(args.host, args.port, args.socket)
+    print(f"Meal prep service listening on {args.socket or f'http://{args.host}:{args.port}'}")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+    await stop.wait()
+
+    print("Draining in-flight requests...")
+    await service.drain()
+    if recorder:
+        recorder.close()
+    if client is not None:
+        await client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,224 @@
+"""Async recipe store used by the async function tools.
+
+`InMemoryRecipeStore` wraps `RECIPE_DATABASE` and never blocks.
+`SQLiteRecipeStore` keeps recipes on disk behind a small connection pool and
+runs every query in a worker thread, so slow lookups don't stall the event
+loop for other workflows running in the same process.
+
+The store set with `set_store()` is the catalogue for the whole workflow: the
+manager seeds it with sample recipes if it is empty, and the plan cache, local repair and the ingredient-overlap
+optimiser read their recipes from it. Recipes must be added through the store
+(e.g. the `add_recipe` tool) for those to see them.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator, Callable, Iterable
+from contextlib import asynccontextmanager
+from typing import Any
+
+from .tools import RECIPE_DATABASE, Recipe, recipe_matches
+
+
+class RecipeStore(ABC):
+    """Async interface for recipe storage backends.
+
+    `revision` changes whenever recipes are added through the store, so callers
+    that keep a snapshot of the catalogue know when to reload it.
+    """
+
+    revision: int = 0
+
+    @abstractmethod
+    async def get_recipe(self, name: str) -> Recipe | None:
+        """Get a recipe by its exact name."""
+
+    @abstractmethod
+    async def get_recipes_by_names(self, names: Iterable[str]) -> dict[str, Recipe]:
+        """Get several recipes in one round trip. Missing names are left out."""
+
+    @abstractmethod
+    async def search(self, query: str, max_results: int = 5) -> list[Recipe]:
+        """Search for recipes matching the query."""
+
+    @abstractmethod
+    async def all_recipes(self) -> list[Recipe]:
+        """Return every recipe in the store."""
+
+    @abstractmethod
+    async def count(self) -> int:
+        """Return the number of recipes in the store."""
+
+    @abstractmethod
+    async def add_recipes(self, recipes: Iterable[Recipe]) -> None:
+        """Add or replace recipes."""
+
+    async def add_recipe(self, recipe: Recipe) -> None:
+        """Add or replace a single recipe."""
+        await self.add_recipes([recipe])
+
+    async def close(self) -> None:
+        """Release any resources held by the store."""
+
+
+class InMemoryRecipeStore(RecipeStore):
+    """Store backed by an in-process dict (`RECIPE_DATABASE` by default)."""
+
+    def __init__(self, recipes: dict[str, Recipe] | None = None) -> None:
+        self.recipes = RECIPE_DATABASE if recipes is None else recipes
+
+    async def get_recipe(self, name: str) -> Recipe | None:
+        return self.recipes.get(name)
+
+    async def get_recipes_by_names(self, names: Iterable[str]) -> dict[str, Recipe]:
+        return {name: self.recipes[name] for name in names if name in self.recipes}
+
+    async def search(self, query: str, max_results: int = 5) -> list[Recipe]:
+        matches = []
+        for recipe in self.recipes.values():
+            if recipe_matches(recipe, query):
+                matches.append(recipe)
+                if len(matches) >= max_results:
+                    break
+        return matches
+
+    async def all_recipes(self) -> list[Recipe]:
+        return list(self.recipes.values())
+
+    async def count(self) -> int:
+        return len(self.recipes)
+
+    async def add_recipes(self, recipes: Iterable[Recipe]) -> None:
+        for recipe in recipes:
+            self.recipes[recipe.name] = recipe
+        self.revision += 1
+
+
+class ConnectionPool:
+    """Fixed-size pool of blocking connections shared across tasks.
+
+    At most `size` connections are borrowed at once; callers beyond that wait
+    for one to be released. Connections are opened lazily, and a failed open
+    gives its slot back so later callers retry instead of waiting forever.
+    """
+
+    def __init__(self, connect: Callable[[], Any], size: int = 4) -> None:
+        self._connect = connect
+        self._slots = asyncio.Semaphore(size)
+        self._idle: list[Any] = []
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[Any]:
+        """Borrow a connection for the duration of the block."""
+        async with self._slots:
+            conn = self._idle.pop() if self._idle else await asyncio.to_thread(self._connect)
+            try:
+                yield conn
+            finally:
+                self._idle.append(conn)
+
+    async def close(self) -> None:
+        """Close every idle connection."""
+        while self._idle:
+            await asyncio.to_thread(self._idle.pop().close)
+
+
+class SQLiteRecipeStore(RecipeStore):
+    """Store that keeps recipes in a SQLite file.
+
+    Queries run in worker threads on pooled connections.
+    """
+
+    def __init__(self, path: str, pool_size: int = 4) -> None:
+        self.path = path
+        self.pool = ConnectionPool(self._connect, pool_size)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS recipes (name TEXT PRIMARY KEY, data TEXT NOT NULL)"
+        )
+        conn.commit()
+        return conn
+
+    async def _execute(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        async with self.pool.acquire() as conn:
+            return await asyncio.to_thread(fn, conn)
+
+    async def get_recipe(self, name: str) -> Recipe | None:
+        recipes = await self.get_recipes_by_names([name])
+        return recipes.get(name)
+
+    async def get_recipes_by_names(self, names: Iterable[str]) -> dict[str, Recipe]:
+        names = list(dict.fromkeys(names))
+        if not names:
+            return {}
+
+        def query(conn: sqlite3.Connection) -> list[tuple[str, str]]:
+            placeholders = ", ".join("?" for _ in names)
+            return conn.execute(
+                f"SELECT name, data FROM recipes WHERE name IN ({placeholders})", names
+            ).fetchall()
+
+        rows = await self._execute(query)
+        return {name: Recipe.model_validate_json(data) for name, data in rows}
+
+    async def search(self, query: str, max_results: int = 5) -> list[Recipe]:
+        # Narrow down in SQL, then apply the same matching rules as the in-memory store
+        def select(conn: sqlite3.Connection) -> list[tuple[str]]:
+            return conn.execute(
+                "SELECT data FROM recipes WHERE lower(data) LIKE ? ORDER BY rowid",
+                (f"%{query.lower()}%",),
+            ).fetchall()
+
+        matches = []
+        for (data,) in await self._execute(select):
+            recipe = Recipe.model_validate_json(data)
+            if recipe_matches(recipe, query):
+                matches.append(recipe)
+                if len(matches) >= max_results:
+                    break
+        return matches
+
+    async def all_recipes(self) -> list[Recipe]:
+        def select(conn: sqlite3.Connection) -> list[tuple[str]]:
+            return conn.execute("SELECT data FROM recipes ORDER BY rowid").fetchall()
+
+        return [Recipe.model_validate_json(data) for (data,) in await self._execute(select)]
+
+    async def count(self) -> int:
+        def select(conn: sqlite3.Connection) -> int:
+            return conn.execute("SELECT COUNT(*) FROM recipes").fetchone()[0]
+
+        return await self._execute(select)
+
+    async def add_recipes(self, recipes: Iterable[Recipe]) -> None:
+        rows = [(recipe.name, recipe.model_dump_json()) for recipe in recipes]
+
+        def insert(conn: sqlite3.Connection) -> None:
+            conn.executemany("INSERT OR REPLACE INTO recipes (name, data) VALUES (?, ?)", rows)
+            conn.commit()
+
+        await self._execute(insert)
+        self.revision += 1
+
+    async def close(self) -> None:
+        await self.pool.close()
+
+
+# Store used by the async tools. Swap it with set_store() to change backend.
+_store: RecipeStore = InMemoryRecipeStore()
+
+
+def get_store() -> RecipeStore:
+    """Return the store used by the async tools."""
+    return _store
+
+
+def set_store(store: RecipeStore) -> None:
+    """Replace the store used by the async tools."""
+    global _store
+    _store = store
@@ -0,0 +1,83 @@
+from examples.meal_prep.cache import PlanCache, parse_intent
+
+
+def test_equivalent_queries_share_an_intent():
+    first = parse_intent("3 days vegetarian quick meals")
+    second = parse_intent("Quick vegetarian meals for 3 days")
+    assert first.key() == second.key()
+    assert first.cacheable() and second.cacheable()
+    assert first.days == 3
+    assert first.dietary == ["vegetarian"]
+    assert first.max_minutes == 30
+
+
+def test_weeks_and_explicit_minutes():
+    intent = parse_intent("Plan 2 weeks of keto meals under 20 minutes")
+    assert intent.days == 14
+    assert intent.dietary == ["keto"]
+    assert intent.max_minutes == 20
+    assert intent.cacheable()
+
+
+def test_vegan_replaces_vegetarian():
+    assert parse_intent("vegan vegetarian meals for a week").dietary == ["vegan"]
+
+
+def test_cuisine():
+    intent = parse_intent("Italian meals for 5 days")
+    assert intent.cuisine == "italian"
+    assert intent.cacheable()
+
+
+def test_servings_are_part_of_the_key():
+    family = parse_intent("Plan meals for a family of 4 for 3 days")
+    couple = parse_intent("Plan meals for 2 people for 3 days")
+    plain = parse_intent("Plan meals for 3 days")
+    assert family.servings == 4
+    assert couple.servings == 2
+    assert plain.servings is None
+    assert len({family.key(), couple.key(), plain.key()}) == 3
+    assert family.cacheable() and couple.cacheable()
+
+
+def test_negated_diets_are_not_parsed_as_the_diet():
+    for query in ("non-vegetarian meals for 3 days", "3 days of meals, not vegan"):
+        intent = parse_intent(query)
+        assert intent.dietary == []
+        assert not intent.cacheable()
+
+
+def test_unparsed_constraints_are_not_cacheable():
+    allergy = parse_intent("Plan meals for a family of 4 with chicken, no nuts")
+    salmon = parse_intent("Plan me some salmon dinners")
+    assert "nuts" in allergy.unparsed
+    assert "salmon" in salmon.unparsed
+    assert not allergy.cacheable()
+    assert not salmon.cacheable()
+
+
+def test_empty_intent_is_not_cacheable():
+    intent = parse_intent("Plan some meals please")
+    assert intent.unparsed == []
+    assert not intent.cacheable()
+
+
+def test_unparsed_words_are_not_part_of_the_key():
+    assert "unparsed" not in parse_intent("3 days of salmon").key()
+
+
+def test_schema_version_separates_entries(tmp_path):
+    intent = parse_intent("3 days vegetarian")
+    old = PlanCache(str(tmp_path), variants=1, schema_version="old")
+    new = PlanCache(str(tmp_path), variants=1, schema_version="new")
+    old.put(intent, {"plan": 1})
+    assert old.get(intent) == {"plan": 1}
+    assert new.get(intent) is None
+
+
+def test_invalidate_removes_entry(tmp_path):
+    intent = parse_intent("3 days vegetarian")
+    cache = PlanCache(str(tmp_path), variants=1)
+    cache.put(intent, {"plan": 1})
+    cache.invalidate(intent)
+    assert cache.get(intent) is None
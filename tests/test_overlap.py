@@ -0,0 +1,58 @@
+from examples.meal_prep.models import DayPlan, MealItem, MealPlan
+from examples.meal_prep.overlap import IngredientIndex, optimize_plan
+from examples.meal_prep.tools import Recipe
+
+
+def _recipe(name: str, ingredients: list[str], tags: list[str] | None = None) -> Recipe:
+    return Recipe(
+        name=name,
+        ingredients=ingredients,
+        instructions=[],
+        prep_time_minutes=10,
+        cook_time_minutes=10,
+        servings=2,
+        dietary_tags=tags or [],
+    )
+
+
+INDEX = IngredientIndex(
+    [
+        _recipe("Chicken Rice", ["chicken", "rice", "2 tbsp olive oil", "Salt and pepper"]),
+        _recipe("Chicken Salad", ["chicken", "lettuce", "2 tbsp olive oil"]),
+        _recipe("Beef Stew", ["beef", "carrots", "potatoes", "Salt and pepper"]),
+        _recipe("Lamb Curry", ["lamb", "coconut milk", "curry paste", "2 tbsp olive oil"]),
+        _recipe("Tofu Bowl", ["tofu", "rice", "lettuce"], ["vegan"]),
+    ]
+)
+
+
+def _plan(*names: str) -> MealPlan:
+    return MealPlan(
+        days=[
+            DayPlan(day=f"Day {number}", meals=[MealItem(meal_type="dinner", recipe_name=name)])
+            for number, name in enumerate(names, start=1)
+        ],
+        total_days=len(names),
+    )
+
+
+def test_optimised_plan_has_no_repeated_recipes():
+    result = optimize_plan(_plan("Chicken Rice", "Beef Stew", "Lamb Curry"), INDEX)
+    names = [meal.recipe_name for day in result.meal_plan.days for meal in day.meals]
+    assert result.swaps
+    assert len(set(names)) == len(names)
+    assert result.unique_items_after < result.unique_items_before
+
+
+def test_pantry_staples_are_not_shared_ingredients():
+    assert "olive oil" not in INDEX.ingredient_ids
+    assert "salt and pepper" not in INDEX.ingredient_ids
+    result = optimize_plan(_plan("Chicken Rice", "Beef Stew", "Lamb Curry"), INDEX, max_repeats=3)
+    assert result.batch_prep == []
+    result = optimize_plan(_plan("Chicken Rice", "Chicken Salad"), INDEX)
+    assert result.batch_prep == ["Prep chicken once for: Day 1 (Chicken Rice), Day 2 (Chicken Salad)"]
+
+
+def test_substitutes_keep_dietary_tags():
+    result = optimize_plan(_plan("Tofu Bowl", "Beef Stew"), INDEX)
+    assert result.meal_plan.days[0].meals[0].recipe_name == "Tofu Bowl"
@@ -0,0 +1,73 @@
+from examples.meal_prep.models import DayPlan, MealItem, MealPlan
+from examples.meal_prep.repair import repair_meal_plan, snap_recipe_name
+from examples.meal_prep.tools import Recipe
+
+
+def _recipe(name: str, tags: list[str]) -> Recipe:
+    return Recipe(
+        name=name,
+        ingredients=[],
+        instructions=[],
+        prep_time_minutes=10,
+        cook_time_minutes=10,
+        servings=2,
+        dietary_tags=tags,
+    )
+
+
+CATALOGUE = {
+    recipe.name: recipe
+    for recipe in (
+        _recipe("Beef Tacos", []),
+        _recipe("Grilled Salmon with Vegetables", ["high-protein"]),
+        _recipe("Vegetarian Pasta Primavera", ["vegetarian"]),
+    )
+}
+
+
+def test_cosmetic_differences_are_snapped():
+    assert snap_recipe_name("beef taco", CATALOGUE) == "Beef Tacos"
+    assert snap_recipe_name(" Beef tacos! ", CATALOGUE) == "Beef Tacos"
+    assert snap_recipe_name("Salmon, Grilled with Vegetable", CATALOGUE) == (
+        "Grilled Salmon with Vegetables"
+    )
+
+
+def test_different_dishes_are_not_snapped():
+    for name in (
+        "Grilled Tofu with Vegetables",
+        "Grilled Shrimp with Vegetables",
+        "Vegan Pasta Primavera",
+    ):
+        assert snap_recipe_name(name, CATALOGUE) == name
+
+
+def test_never_snaps_to_a_recipe_without_the_requested_diet():
+    assert snap_recipe_name("beef taco", CATALOGUE, ["vegetarian"]) == "beef taco"
+    assert snap_recipe_name("vegetarian pasta primavera", CATALOGUE, ["vegetarian"]) == (
+        "Vegetarian Pasta Primavera"
+    )
+
+
+def _day(number: int, *meal_types: str) -> DayPlan:
+    return DayPlan(
+        day=f"Day {number}",
+        meals=[MealItem(meal_type=meal_type, recipe_name="Beef Tacos") for meal_type in meal_types],
+    )
+
+
+def test_only_days_that_deviate_from_the_plan_are_broken():
+    plan = MealPlan(
+        days=[_day(1, "lunch", "dinner"), _day(2, "lunch", "dinner"), _day(3, "dinner")],
+        total_days=3,
+    )
+    _, broken = repair_meal_plan(plan, CATALOGUE)
+    assert broken == {2: ["missing lunch"]}
+
+
+def test_meals_named_in_the_query_are_required():
+    plan = MealPlan(days=[_day(1, "dinner"), _day(2, "dinner")], total_days=2)
+    _, broken = repair_meal_plan(plan, CATALOGUE, query="Plan dinners for 2 days")
+    assert broken == {}
+    _, broken = repair_meal_plan(plan, CATALOGUE, query="Plan lunches and dinners for 2 days")
+    assert broken == {0: ["missing lunch"], 1: ["missing lunch"]}
@@ -37,51 +37,20 @@ class NutritionInfo(BaseModel):
 RECIPE_DATABASE: dict[str, Recipe] = {}
 
 
-@function_tool
-def search_recipes(
-    query: Annotated[str, "Search query (e.g., 'pasta', 'chicken', 'vegetarian')"],
-    max_results: Annotated[int, "Maximum number of recipes to return"] = 5,
-) -> list[Recipe]:
-    """Search for recipes matching the query."""
+def recipe_matches(recipe: Recipe, query: str) -> bool:
+    """Check whether a recipe matches a search query."""
     query_lower = query.lower()
-    matches = []
-
-    for recipe in RECIPE_DATABASE.values():
-        if (
-            query_lower in recipe.name.lower()
-            or any(query_lower in ing.lower() for ing in recipe.ingredients)
-            or any(query_lower in tag.lower() for tag in recipe.dietary_tags)
-            or (recipe.cuisine_type and query_lower in recipe.cuisine_type.lower())
-        ):
-            matches.append(recipe)
-            if len(matches) >= max_results:
-                break
-
-    return matches
-
-
-@function_tool
-def get_recipe_by_name(
-    name: Annotated[str, "Exact name of the recipe"]
-) -> Recipe | None:
-    """Get a recipe by its exact name."""
-    return RECIPE_DATABASE.get(name)
-
-
-@function_tool
-def add_recipe(recipe: Annotated[Recipe, "The recipe to add"]) -> str:
-    """Add a new recipe to the database."""
-    RECIPE_DATABASE[recipe.name] = recipe
-    return f"Added recipe: {recipe.name}"
+    return (
+        query_lower in recipe.name.lower()
+        or any(query_lower in ing.lower() for ing in recipe.ingredients)
+        or any(query_lower in tag.lower() for tag in recipe.dietary_tags)
+        or bool(recipe.cuisine_type and query_lower in recipe.cuisine_type.lower())
+    )
 
 
-@function_tool
-def calculate_nutrition(
-    ingredients: Annotated[list[str], "List of ingredients with quantities"],
-    servings: Annotated[int, "Number of servings"] = 4,
-) -> NutritionInfo:
+def estimate_nutrition(ingredients: list[str], servings: int = 4) -> NutritionInfo:
     """
-    Calculate approximate nutritional information for a recipe.
+    Calculate approximate nutritional information for a list of ingredients.
     This is a simplified calculation - in production, you'd use a real nutrition API.
     """
     # Simplified nutrition calculation based on common ingredients
@@ -130,29 +99,22 @@ def calculate_nutrition(
     )
 
 
-@function_tool
-def generate_shopping_list(
-    recipes: Annotated[list[str], "List of recipe names"],
-    servings_multiplier: Annotated[float, "Multiply servings by this factor"] = 1.0,
+def consolidate_ingredients(
+    recipes: list[Recipe], servings_multiplier: float = 1.0
 ) -> list[str]:
-    """
-    Generate a consolidated shopping list from multiple recipes.
-    Combines ingredients and groups similar items together.
-    """
+    """Combine the ingredients of several recipes into a sorted shopping list."""
     all_ingredients: list[str] = []
 
-    for recipe_name in recipes:
-        recipe = RECIPE_DATABASE.get(recipe_name)
-        if recipe:
-            # Adjust servings if needed
-            if servings_multiplier != 1.0:
-                adjusted_ingredients = []
-                for ing in recipe.ingredients:
-                    # Simple adjustment - in production, you'd parse quantities properly
-                    adjusted_ingredients.append(ing)
-                all_ingredients.extend(adjusted_ingredients)
-            else:
-                all_ingredients.extend(recipe.ingredients)
+    for recipe in recipes:
+        # Adjust servings if needed
+        if servings_multiplier != 1.0:
+            adjusted_ingredients = []
+            for ing in recipe.ingredients:
+                # Simple adjustment - in production, you'd parse quantities properly
+                adjusted_ingredients.append(ing)
+            all_ingredients.extend(adjusted_ingredients)
+        else:
+            all_ingredients.extend(recipe.ingredients)
 
     # Group similar ingredients (simplified - in production, use NLP to group)
     consolidated: dict[str, list[str]] = {}
@@ -175,16 +137,8 @@ def generate_shopping_list(
     return sorted(shopping_list)
 
 
-@function_tool
-def get_cooking_tips(
-    recipe_name: Annotated[str, "Name of the recipe"],
-    step_number: Annotated[int | None, "Specific step number, or None for general tips"] = None,
-) -> str:
-    """Get helpful cooking tips for a recipe or specific step."""
-    recipe = RECIPE_DATABASE.get(recipe_name)
-    if not recipe:
-        return f"Recipe '{recipe_name}' not found."
-
+def cooking_tips_for(recipe: Recipe, step_number: int | None = None) -> str:
+    """Build cooking tips for a recipe or one of its steps."""
     if step_number is not None and 1 <= step_number <= len(recipe.instructions):
         step = recipe.instructions[step_number - 1]
         return f"Tip for step {step_number} ({step[:50]}...): Make sure to follow the timing carefully and check doneness before proceeding."
@@ -207,3 +161,73 @@ def get_cooking_tips(
         tips.append("Taste as you go and adjust seasoning accordingly.")
 
     return "\n".join(f"• {tip}" for tip in tips)
+
+
+@function_tool
+def search_recipes(
+    query: Annotated[str, "Search query (e.g., 'pasta', 'chicken', 'vegetarian')"],
+    max_results: Annotated[int, "Maximum number of recipes to return"] = 5,
+) -> list[Recipe]:
+    """Search for recipes matching the query."""
+    matches = []
+
+    for recipe in RECIPE_DATABASE.values():
+        if recipe_matches(recipe, query):
+            matches.append(recipe)
+            if len(matches) >= max_results:
+                break
+
+    return matches
+
+
+@function_tool
+def get_recipe_by_name(
+    name: Annotated[str, "Exact name of the recipe"]
+) -> Recipe | None:
+    """Get a recipe by its exact name."""
+    return RECIPE_DATABASE.get(name)
+
+
+@function_tool
+def add_recipe(recipe: Annotated[Recipe, "The recipe to add"]) -> str:
+    """Add a new recipe to the database."""
+    RECIPE_DATABASE[recipe.name] = recipe
+    return f"Added recipe: {recipe.name}"
+
+
+@function_tool
+def calculate_nutrition(
+    ingredients: Annotated[list[str], "List of ingredients with quantities"],
+    servings: Annotated[int, "Number of servings"] = 4,
+) -> NutritionInfo:
+    """
+    Calculate approximate nutritional information for a recipe.
+    This is a simplified calculation - in production, you'd use a real nutrition API.
+    """
+    return estimate_nutrition(ingredients, servings)
+
+
+@function_tool
+def generate_shopping_list(
+    recipes: Annotated[list[str], "List of recipe names"],
+    servings_multiplier: Annotated[float, "Multiply servings by this factor"] = 1.0,
+) -> list[str]:
+    """
+    Generate a consolidated shopping list from multiple recipes.
+    Combines ingredients and groups similar items together.
+    """
+    found = [RECIPE_DATABASE[name] for name in recipes if name in RECIPE_DATABASE]
+    return consolidate_ingredients(found, servings_multiplier)
+
+
+@function_tool
+def get_cooking_tips(
+    recipe_name: Annotated[str, "Name of the recipe"],
+    step_number: Annotated[int | None, "Specific step number, or None for general tips"] = None,
+) -> str:
+    """Get helpful cooking tips for a recipe or specific step."""
+    recipe = RECIPE_DATABASE.get(recipe_name)
+    if not recipe:
+        return f"Recipe '{recipe_name}' not found."
+
+    return cooking_tips_for(recipe, step_number)